@@ -0,0 +1,26 @@
+"""Shared bootstrap for the CLI scripts.
+
+Every script used to repeat the same sys.path surgery and .env loading
+at module top; importing this module instead does the path insert once
+per process (Python's module cache makes repeat imports free) and
+exposes a lazy load_env() so scripts only touch the filesystem when
+they actually need credentials.
+"""
+
+import os
+import sys
+
+PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOTENV_PATH = os.path.join(PARENT, '.env')
+
+if PARENT not in sys.path:
+    sys.path.insert(0, PARENT)
+
+def load_env():
+    """Read the repo-level .env, skipped when the token is already set.
+
+    override=False keeps caller-provided environment variables
+    authoritative over the file."""
+    if 'ROAM_API_TOKEN' not in os.environ:
+        from dotenv import load_dotenv
+        load_dotenv(DOTENV_PATH, override=False)
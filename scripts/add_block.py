@@ -26,79 +26,84 @@ Environment:
 """
 
 import os
+import re
 import sys
+import secrets
 import argparse
-from dotenv import load_dotenv
 import logging
 from datetime import datetime
 
-# Add the parent directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from roamClient import initialize_graph, create_page, create_block, q
+from _bootstrap import load_env
+from roamClient import initialize_graph, create_page, create_block, batch_actions, q
 from roam_utils import get_roam_date_format, is_valid_date_string, extract_uid
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s at Line %(lineno)d')
 
-# Load environment variables from the parent directory
-dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-load_dotenv(dotenv_path)
+# Stable query shapes with :in bindings: the server sees one query text
+# per shape, and quotes in titles or block text can't break the query
+_Q_PAGE_UID = '[:find ?uid . :in $ ?title :where [?e :node/title ?title] [?e :block/uid ?uid]]'
+# String clause first: the indexed :block/string lookup narrows candidates
+# to blocks with that exact text before the parent filter, instead of
+# walking every child of the page
+_Q_CHILD_BY_STRING = '[:find ?uid . :in $ ?page_uid ?string :where [?c :block/string ?string] [?e :block/children ?c] [?e :block/uid ?page_uid] [?c :block/uid ?uid]]'
+
+def gen_uid():
+    """Generate a 9-character block UID client-side (Roam accepts user-supplied UIDs)."""
+    return re.sub(r'[^A-Za-z0-9]', '', secrets.token_urlsafe(12))[:9]
 
 def get_or_create_page_uid_from_title(client, page_title):
-    query = f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]'
-    page_uid = q(client, query)
+    page_uid = q(client, _Q_PAGE_UID, [page_title])
 
     if not page_uid:
         logging.info(f"Page '{page_title}' not found. Creating it.")
+        # Supplying the UID ourselves means the create's 200 already tells
+        # us the page's UID — no follow-up lookup round-trip needed
+        page_uid = gen_uid()
         create_page_body = {
             'action': 'create-page',
-            'page': {'title': page_title}
+            'page': {'title': page_title, 'uid': page_uid}
         }
         create_page_status = create_page(client, create_page_body)
-        if create_page_status == 200:
-            page_uid = q(client, query)
-        else:
+        if create_page_status != 200:
             logging.error(f"Failed to create page '{page_title}'. Status code: {create_page_status}")
             return None
 
     return page_uid
 
 def find_or_create_parent_block(client, page_uid, parent_text):
-    query = f'[:find ?uid . :where [?e :block/uid "{page_uid}"] [?e :block/children ?c] [?c :block/string "{parent_text}"] [?c :block/uid ?uid]]'
-    parent_uid = q(client, query)
+    parent_uid = q(client, _Q_CHILD_BY_STRING, [page_uid, parent_text])
 
     if not parent_uid:
         logging.info(f"Parent block '{parent_text}' not found. Creating it.")
+        # Same trick as page creation: a client-generated UID makes the
+        # create round-trip also the lookup
+        parent_uid = gen_uid()
         create_block_body = {
             'action': 'create-block',
             'location': {'parent-uid': page_uid, 'order': 0},
-            'block': {'string': parent_text}
+            'block': {'string': parent_text, 'uid': parent_uid}
         }
         create_block_status = create_block(client, create_block_body)
-        if create_block_status == 200:
-            parent_uid = q(client, query)
-        else:
+        if create_block_status != 200:
             logging.error(f"Failed to create parent block '{parent_text}'. Status code: {create_block_status}")
             return None
 
     return parent_uid
 
 def add_blocks(client, parent_uid, block_texts, order):
-    success_count = 0
-    for block_text in block_texts:
-        create_block_body = {
-            'action': 'create-block',
-            'location': {'parent-uid': parent_uid, 'order': 0 if order == 'first' else -1},
-            'block': {'string': block_text.strip()}
-        }
-        create_block_status = create_block(client, create_block_body)
-        if create_block_status == 200:
-            success_count += 1
-            logging.info(f"Successfully added block: {block_text}")
-        else:
-            logging.error(f"Failed to add block '{block_text}'. Status code: {create_block_status}")
-
-    return success_count
+    # One batch-actions POST instead of a round-trip per block: N blocks
+    # cost one request and one rate-limit token
+    actions = [{
+        'action': 'create-block',
+        'location': {'parent-uid': parent_uid, 'order': 0 if order == 'first' else -1},
+        'block': {'string': block_text.strip()}
+    } for block_text in block_texts]
+    status = batch_actions(client, actions)
+    if status == 200:
+        logging.info(f"Successfully added {len(actions)} block(s)")
+        return len(actions)
+    logging.error(f"Failed to add blocks. Status code: {status}")
+    return 0
 
 def main():
     parser = argparse.ArgumentParser(description="Add one or more blocks to a page in Roam Research.")
@@ -109,6 +114,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Read .env only after argparse has run, so --help never touches the filesystem
+    load_env()
+
     # Initialize RoamBackendClient
     client = initialize_graph({'token': os.getenv('ROAM_API_TOKEN'), 'graph': os.getenv('ROAM_GRAPH_NAME')})
 
@@ -138,8 +146,17 @@ def main():
     else:
         parent_uid = page_uid
 
-    # Split the input text into lines and reverse the order
-    block_texts = args.blocktext.split('\\n')
+    # Split the input text into lines, dropping whitespace-only lines and
+    # consecutive duplicates (paste artifacts) so no round-trip is spent
+    # creating empty or repeated blocks
+    block_texts = []
+    for text in args.blocktext.split('\\n'):
+        text = text.strip()
+        if text and (not block_texts or text != block_texts[-1]):
+            block_texts.append(text)
+    if not block_texts:
+        logging.error("No non-empty blocks to add")
+        sys.exit(1)
     block_texts.reverse()
 
     # Add the blocks
@@ -72,7 +72,12 @@ SOFTWARE.
 import os
 import argparse
 import logging
+import mmap
+import multiprocessing
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 import openai
 import anthropic
@@ -113,8 +118,14 @@ def read_prompts(prompt_file: str) -> List[str]:
 		if not os.path.exists(prompt_path):
 			raise FileNotFoundError(f"Default prompt file not found: {prompt_path}")
 
-	with open(prompt_path, 'r') as file:
-		return file.read().splitlines()
+	# Keyed on mtime so an edited prompt file busts the entry; repeated
+	# invocations in the same process (library use, batch drivers) skip
+	# the disk entirely
+	return list(_read_prompts_cached(prompt_path, os.path.getmtime(prompt_path)))
+
+@lru_cache(maxsize=32)
+def _read_prompts_cached(prompt_path: str, mtime: float) -> tuple:
+	return tuple(_read_file(prompt_path).splitlines())
 
 def convert_pdf_to_text(pdf_path: str, output_path: str):
 	"""Convert a PDF file to text using pdftotext."""
@@ -128,15 +139,71 @@ def convert_pdf_to_text(pdf_path: str, output_path: str):
 		logging.error(f"Error converting PDF to text: {str(e)}")
 		raise
 
-def process_file(file_path: str, prompts: List[str], api_function: Callable, conversation_history: List[Dict[str, str]], client: Any) -> str:
-	"""Process a single file using the given API function and update conversation history."""
-	with open(file_path, 'r') as file:
-		content = file.read()
+def _pool_size() -> int:
+	"""Worker count for the preprocessing pools, overridable via env."""
+	configured = os.getenv('LOAD_DOCUMENTS_NUMBER_OF_THREADS')
+	if configured:
+		return max(1, int(configured))
+	return max(1, (os.cpu_count() or 2) - 1)
+
+def _read_file(file_path: str) -> str:
+	"""Decode a file's contents straight from an mmap of its pages.
+
+	str(mm, 'utf-8') decodes directly out of the mapped pages, so the only
+	allocation is the final string — file.read() in text mode goes through
+	the buffered/decoder layers and an extra copy. Empty files can't be
+	mapped, hence the size guard."""
+	with open(file_path, 'rb') as file:
+		if os.fstat(file.fileno()).st_size == 0:
+			return ''
+		with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			return str(mm, 'utf-8')
+
+def load_documents(source_dir: str, suffix: str = '.txt') -> Dict[str, str]:
+	"""Read every matching file in the folder in parallel.
+
+	The read phase sits on the critical path before any LLM call; a
+	worker pool gets it off a single thread so large folders load in
+	roughly one file's time per core. Returns {filename: content} in
+	sorted filename order."""
+	# scandir's DirEntry carries the type bit from the directory read, so
+	# filtering to files costs no extra stat per entry
+	with os.scandir(source_dir) as entries:
+		found = sorted((e.name, e.path) for e in entries
+					   if e.name.endswith(suffix) and e.is_file())
+	filenames = [name for name, _ in found]
+	paths = [path for _, path in found]
+	if not paths:
+		return {}
+	with multiprocessing.Pool(min(_pool_size(), len(paths))) as pool:
+		contents = pool.map(_read_file, paths)
+	return dict(zip(filenames, contents))
+
+def convert_pdfs_to_text(pairs: List[tuple]):
+	"""Convert many (pdf_path, output_path) pairs concurrently.
+
+	Each conversion is an independent pdftotext subprocess, so a pool of
+	workers turns a serial one-at-a-time pass into a near-linear
+	speedup on multi-core machines."""
+	if not pairs:
+		return
+	with multiprocessing.Pool(min(_pool_size(), len(pairs))) as pool:
+		pool.starmap(convert_pdf_to_text, pairs)
+
+def process_file(file_path: str, prompts: List[str], api_function: Callable, conversation_history: List[Dict[str, str]], client: Any, out_fp: Any = None) -> str:
+	"""Process a single file using the given API function and update conversation history.
+
+	When out_fp is given, response tokens stream into it as they arrive,
+	so the file on disk fills during generation instead of appearing all
+	at once after it; the joined result is still returned."""
+	content = _read_file(file_path)
 
 	results = []
 	try:
 		for prompt in prompts:
-			result = api_function(content, prompt, conversation_history, client)
+			if out_fp and results:
+				out_fp.write("\n\n")
+			result = api_function(content, prompt, conversation_history, client, out_fp=out_fp)
 			results.append(result)
 			# Update conversation history
 			conversation_history.append({"role": "user", "content": content})
@@ -147,106 +214,278 @@ def process_file(file_path: str, prompts: List[str], api_function: Callable, con
 		logging.error(f"Error processing file {file_path}: {str(e)}")
 		return ""
 
-def openai_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any) -> str:
-	"""Make an API call to OpenAI's GPT."""
+def openai_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any, out_fp: Any = None) -> str:
+	"""Make an API call to OpenAI's GPT, streaming tokens as they arrive."""
 	try:
+		# Order matters for provider-side prompt caching: the static
+		# system prompt first, then the append-only history, then the new
+		# turn, keeps the prefix stable across calls so prefill is reused
 		messages = [{"role": "system", "content": prompt}] + conversation_history + [{"role": "user", "content": content}]
-		response = client.ChatCompletion.create(
+		buf = []
+		for chunk in client.chat.completions.create(
 			model="gpt-3.5-turbo",  # Use the latest available model
-			messages=messages
-		)
-		return response.choices[0].message.content
+			messages=messages,
+			stream=True
+		):
+			delta = chunk.choices[0].delta.content if chunk.choices else None
+			if delta:
+				if out_fp:
+					out_fp.write(delta)
+				buf.append(delta)
+		return "".join(buf)
 	except Exception as e:
 		logging.error(f"OpenAI API error: {str(e)}")
 		raise
 
-def claude_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any) -> str:
-	"""Make an API call to Claude AI."""
+def claude_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any, out_fp: Any = None) -> str:
+	"""Make an API call to Claude AI, streaming tokens as they arrive."""
 	try:
-		# Construct conversation history string
-		history_str = ""
-		for message in conversation_history:
-			if message["role"] == "user":
-				history_str += f"{anthropic.HUMAN_PROMPT} {message['content']}\n\n"
-			elif message["role"] == "assistant":
-				history_str += f"{anthropic.AI_PROMPT} {message['content']}\n\n"
-
-		full_prompt = f"{anthropic.HUMAN_PROMPT} {prompt}\n\nConversation history:\n{history_str}\nNew content to process:\n{content}{anthropic.AI_PROMPT}"
-
-		response = client.completion(
-			prompt=full_prompt,
-			model="claude-2.0",  # Use the latest available model
-			max_tokens_to_sample=1000,
-		)
-		return response.completion
+		# The static prompt lives in the system slot with cache_control so
+		# Anthropic's prompt cache reuses its prefill across turns; the
+		# old completion-style call glued prompt, history, and content
+		# into one ever-changing string, which made every turn a cache miss
+		buf = []
+		with client.messages.stream(
+			model="claude-3-5-sonnet-latest",
+			max_tokens=1000,
+			system=[{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}],
+			messages=conversation_history + [{"role": "user", "content": content}],
+		) as stream:
+			for text in stream.text_stream:
+				if out_fp:
+					out_fp.write(text)
+				buf.append(text)
+		return "".join(buf)
 	except Exception as e:
 		logging.error(f"Claude API error: {str(e)}")
 		raise
 
-def gemini_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any) -> str:
+# One live ChatSession per conversation, keyed by the history list that
+# identifies it. Rebuilding the session from conversation_history on every
+# call re-sent the entire transcript as fresh input each time — the
+# classic quadratic history blowup; a persistent session only pays for
+# the new turn. Holding the list reference keeps its id() stable.
+_gemini_chats: Dict[int, Any] = {}
+
+def gemini_api_call(content: str, prompt: str, conversation_history: List[Dict[str, str]], client: Any, out_fp: Any = None) -> str:
 	"""Make an API call to Google's Gemini AI."""
 	try:
-		# Construct conversation history
-		chat = client.start_chat(history=[
-			{"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]}
-			for msg in conversation_history
-		])
+		entry = _gemini_chats.get(id(conversation_history))
+		if entry is None:
+			chat = client.start_chat(history=[
+				{"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]}
+				for msg in conversation_history
+			])
+			_gemini_chats[id(conversation_history)] = (conversation_history, chat)
+		else:
+			chat = entry[1]
 
 		# Add system prompt and new content
 		full_prompt = f"{prompt}\n\nNew content to process:\n{content}"
-		response = chat.send_message(full_prompt)
-
-		return response.text
+		buf = []
+		for chunk in chat.send_message(full_prompt, stream=True):
+			if chunk.text:
+				if out_fp:
+					out_fp.write(chunk.text)
+				buf.append(chunk.text)
+
+		return "".join(buf)
 	except Exception as e:
 		logging.error(f"Gemini API error: {str(e)}")
 		raise
 
-def process_input(input_path: str, prompts: List[str], output_file: str, api_function: Callable, status_file: str, client: Any):
-	"""Process input (either a single file or a folder) using the given API function."""
+def process_folder_batch(input_path: str, prompts: List[str], output_file: str, status_file: str, model: str = "gpt-4o-mini"):
+	"""Submit a whole folder as one OpenAI Batch job instead of per-file calls.
+
+	Every (file, prompt) pair becomes one JSONL line uploaded in a single
+	request; OpenAI runs them within the completion window at half the
+	token price, and one poll loop replaces N live round-trips. Prompts
+	are applied independently per file (the sequential mode's
+	result-feeds-next-prompt chaining needs intermediate responses, which
+	a batch cannot provide), so use this for prompt sets that stand alone."""
+	import io
+	import json
+	import time
+	from openai import OpenAI
+
+	client = OpenAI()
+	documents = load_documents(input_path)
+	txt_files = list(documents)
+	if not txt_files:
+		raise ValueError(f"No .txt files found in folder: {input_path}")
+
+	lines = []
+	for filename, content in documents.items():
+		for i, prompt in enumerate(prompts):
+			lines.append(json.dumps({
+				"custom_id": f"{filename}::{i}",
+				"method": "POST",
+				"url": "/v1/chat/completions",
+				"body": {
+					"model": model,
+					"messages": [
+						{"role": "system", "content": prompt},
+						{"role": "user", "content": content}
+					]
+				}
+			}))
+
+	batch_input = client.files.create(
+		file=io.BytesIO("\n".join(lines).encode('utf-8')), purpose="batch")
+	batch = client.batches.create(
+		input_file_id=batch_input.id,
+		endpoint="/v1/chat/completions",
+		completion_window="24h")
+	logging.info("Submitted batch %s with %d requests", batch.id, len(lines))
+
+	# Poll with exponential backoff; batches run for minutes to hours, so
+	# there is no point hammering the status endpoint
+	delay = 5
+	while batch.status not in ("completed", "failed", "expired", "cancelled"):
+		set_final_status(status_file, f"BATCH|{batch.status}")
+		time.sleep(delay)
+		delay = min(delay * 2, 300)
+		batch = client.batches.retrieve(batch.id)
+
+	if batch.status != "completed":
+		raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+
+	raw = client.files.content(batch.output_file_id).text
+	by_file = {filename: [""] * max(1, len(prompts)) for filename in txt_files}
+	for line in raw.splitlines():
+		if not line.strip():
+			continue
+		record = json.loads(line)
+		filename, _, index = record["custom_id"].rpartition("::")
+		choices = (record.get("response") or {}).get("body", {}).get("choices") or []
+		if choices:
+			by_file[filename][int(index)] = choices[0]["message"]["content"]
+
+	tmp_folder = os.path.join(input_path, "tmp texts")
+	os.makedirs(tmp_folder, exist_ok=True)
 	results = []
-	conversation_history = []
-
-	if os.path.isfile(input_path):
-		# Process single file
-		update_status(status_file, 1, 1)
-		logging.info(f"Processing file: {input_path}")
-		result = process_file(input_path, prompts, api_function, conversation_history, client)
+	for filename in txt_files:
+		result = "\n\n".join(part for part in by_file[filename] if part)
+		with open(os.path.join(tmp_folder, f"processed_{filename}"), 'w') as tmp_file:
+			tmp_file.write(result)
 		results.append(result)
-	elif os.path.isdir(input_path):
-		# Process folder
-		tmp_folder = os.path.join(input_path, "tmp texts")
-		os.makedirs(tmp_folder, exist_ok=True)
 
-		txt_files = [f for f in os.listdir(input_path) if f.endswith('.txt')]
-		total_files = len(txt_files)
+	output_path = os.path.join(os.path.dirname(input_path), output_file)
+	with open(output_path, 'w') as final_file:
+		final_file.write("\n\n".join(results))
+	logging.info("Batch processing complete. Final output saved to %s", output_path)
+	set_final_status(status_file, "STATUS")
 
-		for current, filename in enumerate(txt_files, 1):
-			update_status(status_file, current, total_files)
-			file_path = os.path.join(input_path, filename)
-			logging.info(f"Processing file: {filename}")
+def _write_history(history_file, messages):
+	for message in messages:
+		history_file.write(f"{message['role']}: {message['content']}\n\n")
 
-			result = process_file(file_path, prompts, api_function, conversation_history, client)
+def process_input(input_path: str, prompts: List[str], output_file: str, api_function: Callable, status_file: str, client: Any, concurrency: int = 1, keep_tmp: bool = True):
+	"""Process input (either a single file or a folder) using the given API function.
 
-			# Save individual result
-			tmp_output_path = os.path.join(tmp_folder, f"processed_{filename}")
-			with open(tmp_output_path, 'w') as tmp_file:
-				tmp_file.write(result)
+	keep_tmp=False skips the per-file copies under "tmp texts": every byte
+	is then written exactly once, straight to the final output."""
+	conversation_history = []
 
-			results.append(result)
-	else:
+	if not os.path.isfile(input_path) and not os.path.isdir(input_path):
 		raise ValueError(f"Invalid input path: {input_path}")
 
-	# Create final output
-	final_output = "\n\n".join(results)
 	output_path = os.path.join(os.path.dirname(input_path), output_file)
-	with open(output_path, 'w') as final_file:
-		final_file.write(final_output)
-
-	# Save conversation history
 	history_path = os.path.join(os.path.dirname(input_path), "conversation_history.txt")
-	with open(history_path, 'w') as history_file:
-		for message in conversation_history:
-			history_file.write(f"{message['role']}: {message['content']}\n\n")
+
+	# Results and history turns stream to disk as they are produced
+	# instead of accumulating in a list that is joined at the end: peak
+	# memory stays at one file's output regardless of folder size, the
+	# partial output survives a crash, and progress can be tailed.
+	with open(output_path, 'w', buffering=1 << 16) as final_file, \
+		 open(history_path, 'w', buffering=1 << 16) as history_file:
+		emitted = [0]  # files written so far, for the blank-line separator
+
+		def emit(result):
+			if emitted[0]:
+				final_file.write("\n\n")
+			final_file.write(result)
+			final_file.flush()
+			emitted[0] += 1
+
+		if os.path.isfile(input_path):
+			# Process single file
+			update_status(status_file, 1, 1)
+			logging.info(f"Processing file: {input_path}")
+			emit(process_file(input_path, prompts, api_function, conversation_history, client))
+			_write_history(history_file, conversation_history)
+		else:
+			# Process folder
+			if keep_tmp:
+				tmp_folder = os.path.join(input_path, "tmp texts")
+				os.makedirs(tmp_folder, exist_ok=True)
+
+			# DirEntry objects carry name, path and the cached type bit, so
+			# no per-entry stat or join is needed downstream
+			with os.scandir(input_path) as entries:
+				txt_files = [(e.name, e.path) for e in entries
+							 if e.name.endswith('.txt') and e.is_file()]
+			total_files = len(txt_files)
+
+			if concurrency > 1:
+				# The per-file work is one blocking HTTP round-trip per prompt,
+				# so files fan out across a small thread pool and wall-clock
+				# scales with the pool size instead of the file count. Each
+				# file gets its own history (cross-file chaining only makes
+				# sense sequentially); histories are stitched together in
+				# input order afterwards so the saved transcript reads the same.
+				progress_lock = threading.Lock()
+				completed = [0]
+				per_file_histories = [[] for _ in txt_files]
+
+				def worker(index_entry):
+					index, (filename, file_path) = index_entry
+					logging.info("Processing file: %s", filename)
+					if keep_tmp:
+						tmp_output_path = os.path.join(tmp_folder, f"processed_{filename}")
+						with open(tmp_output_path, 'w') as tmp_file:
+							result = process_file(file_path, prompts, api_function,
+												  per_file_histories[index], client,
+												  out_fp=tmp_file)
+					else:
+						result = process_file(file_path, prompts, api_function,
+											  per_file_histories[index], client)
+					with progress_lock:
+						completed[0] += 1
+						update_status(status_file, completed[0], total_files)
+					return result
+
+				with ThreadPoolExecutor(max_workers=concurrency) as pool:
+					# pool.map yields in input order, so results stream out
+					# as soon as each file (in order) finishes
+					for result in pool.map(worker, enumerate(txt_files)):
+						emit(result)
+				for history in per_file_histories:
+					conversation_history.extend(history)
+					_write_history(history_file, history)
+			else:
+				for current, (filename, file_path) in enumerate(txt_files, 1):
+					update_status(status_file, current, total_files)
+					logging.info(f"Processing file: {filename}")
+
+					history_mark = len(conversation_history)
+					if keep_tmp:
+						# The per-file result streams into the tmp file as tokens
+						# arrive, so partial output is visible during generation
+						tmp_output_path = os.path.join(tmp_folder, f"processed_{filename}")
+						with open(tmp_output_path, 'w') as tmp_file:
+							result = process_file(file_path, prompts, api_function, conversation_history, client, out_fp=tmp_file)
+						emit(result)
+					else:
+						# No tmp copy wanted, so tokens stream straight into the
+						# final output — each byte is written exactly once
+						if emitted[0]:
+							final_file.write("\n\n")
+						result = process_file(file_path, prompts, api_function, conversation_history, client, out_fp=final_file)
+						final_file.flush()
+						emitted[0] += 1
+					_write_history(history_file, conversation_history[history_mark:])
+					history_file.flush()
 
 	logging.info(f"Processing complete. Final output saved to {output_path}")
 	logging.info(f"Conversation history saved to {history_path}")
@@ -260,6 +499,10 @@ def main():
 	parser.add_argument("-o", "--output", default="final_output.txt", help="Name of the final output file")
 	parser.add_argument("-a", "--api", choices=["openai", "claude", "gemini"], default="openai", help="Choose API: openai, claude, or gemini")
 	parser.add_argument("-s", "--status", default="status.txt", help="Name of the status file")
+	parser.add_argument("-c", "--concurrency", type=int, default=1, help="Number of files to process in parallel when input is a folder (files get independent conversation histories; 1 keeps the sequential shared-history behavior)")
+	parser.add_argument("-b", "--batch", action="store_true", help="Submit a folder as one OpenAI Batch job (half-price tokens, up to 24h turnaround; prompts apply independently per file). Requires -a openai and a folder input.")
+	parser.add_argument("--no-tmp", action="store_true", help="Skip the per-file copies in 'tmp texts' and write results only to the final output (halves write volume for large runs)")
+	parser.add_argument("--cache", action="store_true", help="Cache history-free responses on disk keyed by (prompt, content, model), so re-running the same inputs skips the API entirely")
 	parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {__version__}")
 	args = parser.parse_args()
 
@@ -278,8 +521,7 @@ def main():
 		api_key = os.getenv("OPENAI_API_KEY")
 		if not api_key:
 			raise ValueError("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-		openai.api_key = api_key
-		client = openai
+		client = openai.OpenAI(api_key=api_key)
 		api_function = openai_api_call
 	elif args.api == "claude":
 		api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -295,9 +537,20 @@ def main():
 		client = genai.GenerativeModel('gemini-pro')
 		api_function = gemini_api_call
 
+	if args.cache:
+		from llm_cache import ResponseCache
+		api_function = ResponseCache().wrap(api_function, model=args.api)
+
 	status_file = os.path.join(os.path.dirname(args.input_path), args.status)
 	try:
-		process_input(args.input_path, prompts, args.output, api_function, status_file, client)
+		if args.batch:
+			if args.api != "openai":
+				raise ValueError("--batch is only supported with -a openai")
+			if not os.path.isdir(args.input_path):
+				raise ValueError("--batch requires a folder input")
+			process_folder_batch(args.input_path, prompts, args.output, status_file)
+		else:
+			process_input(args.input_path, prompts, args.output, api_function, status_file, client, concurrency=max(1, args.concurrency), keep_tmp=not args.no_tmp)
 	except Exception as e:
 		error_message = str(e)
 		logging.error(f"An error occurred: {error_message}")
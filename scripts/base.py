@@ -5,7 +5,7 @@ import json
 import os
 import argparse
 from dotenv import load_dotenv
-from roamClient import initialize_graph, q, create_page, create_block
+from roamClient import initialize_graph, q, pull_many, create_page, create_block
 from roam_utils import get_roam_date_format
 
 load_dotenv()
@@ -27,9 +27,9 @@ client = initialize_graph({'graph': graph, 'token': token})
 #
 # log_block_uid = q(client, '[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string ?s] [(clojure.string/includes? ?s "57A06952-0E5F-4D45-B98E-F30906DCCEAA")]]')
 # print(log_block_uid)
-# for uid in log_block_uids:
-# 	block_content = q(client, f'[:find ?string . :where [?e :block/uid "{uid}"] [?e :block/string ?string]]')
-# 	print(f"Block {uid}: {block_content}")
+# One pull-many roundtrip instead of a q call per UID:
+# for block in pull_many(client, '[:block/uid :block/string]', [f'[:block/uid "{uid}"]' for uid in log_block_uids]):
+# 	print(f"Block {block[':block/uid']}: {block[':block/string']}")
 
 # log_block_result = create_block(client, {
 # 	'location': {'parent-uid': daily_page_uid, 'order': 0},
@@ -37,21 +37,24 @@ client = initialize_graph({'graph': graph, 'token': token})
 # })
 # print(f"Results from block creation: {log_block_result}")
 
+# Children lookup parameterized via :in so both call sites share one query text
+_Q_CHILDREN_OF = '[:find ?child_uid ?child_string :in $ ?uid :where [?page :block/uid ?uid] [?page :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]'
+
 def find_nested_block(client, page_identifier, parent_string, target_string):
 	# Step 1: Determine if we're dealing with a page title or UID
 	if page_identifier.startswith('('):  # Assuming UIDs are wrapped in parentheses
 		page_uid = page_identifier.strip('()')
-		page_title_result = q(client, f'[:find ?title :where [?e :block/uid "{page_uid}"] [?e :node/title ?title]]')
+		page_title_result = q(client, '[:find ?title :in $ ?uid :where [?e :block/uid ?uid] [?e :node/title ?title]]', [page_uid])
 		page_title = page_title_result[0][0] if page_title_result else "Unknown"
 	else:
 		page_title = page_identifier
-		page_uid_result = q(client, f'[:find ?uid :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]')
+		page_uid_result = q(client, '[:find ?uid :in $ ?title :where [?e :node/title ?title] [?e :block/uid ?uid]]', [page_title])
 		if not page_uid_result:
 			return f"Page '{page_title}' not found."
 		page_uid = page_uid_result[0][0]
 
 	# Step 2: Find all child blocks of the page
-	child_blocks = q(client, f'[:find ?child_uid ?child_string :where [?page :block/uid "{page_uid}"] [?page :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]')
+	child_blocks = q(client, _Q_CHILDREN_OF, [page_uid])
 
 	# Step 3: Find the parent block
 	parent_block = next((block for block in child_blocks if parent_string in block[1]), None)
@@ -61,7 +64,7 @@ def find_nested_block(client, page_identifier, parent_string, target_string):
 	parent_uid, parent_content = parent_block
 
 	# Step 4: Find all child blocks of the parent block
-	parent_child_blocks = q(client, f'[:find ?child_uid ?child_string :where [?parent :block/uid "{parent_uid}"] [?parent :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]')
+	parent_child_blocks = q(client, _Q_CHILDREN_OF, [parent_uid])
 
 	# Step 5: Find the target block
 	target_block = next((block for block in parent_child_blocks if target_string in block[1]), None)
@@ -0,0 +1,188 @@
+"""
+Asynchronous Roam Research API Client
+
+aiohttp-based counterpart to roam_backend for I/O-bound workloads. The
+synchronous RoamAPI methods each block on a full HTTPS round-trip, so
+loops that touch many blocks serialize their latency; the coroutines
+here let callers overlap those round-trips with asyncio.gather while a
+bounded semaphore keeps concurrency polite.
+"""
+
+from typing import Optional, Dict, Any, List
+import asyncio
+import aiohttp
+
+from roam_backend import RoamAPIError, RoamAuthError, RoamServerError
+
+BASE_URL = 'https://api.roamresearch.com'
+MAX_CONCURRENT_REQUESTS = 16
+MAX_RETRIES = 5
+
+
+def _make_headers(token: str) -> Dict[str, str]:
+    return {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Authorization': f'Bearer {token}',
+        'x-authorization': f'Bearer {token}'
+    }
+
+
+def make_session() -> aiohttp.ClientSession:
+    """Create a pooled ClientSession suitable for many concurrent Roam calls."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=64))
+
+
+async def _post(session: aiohttp.ClientSession, url: str, headers: Dict[str, str],
+                body: Dict[str, Any]) -> Dict[str, Any]:
+    """POST with exponential-backoff retry on 429/503, honoring Retry-After."""
+    for attempt in range(MAX_RETRIES):
+        async with session.post(url, headers=headers, json=body) as resp:
+            if resp.status in (429, 503):
+                retry_after = resp.headers.get('Retry-After')
+                delay = float(retry_after) if retry_after else min(30, 0.5 * (2 ** attempt))
+                await asyncio.sleep(delay)
+                continue
+            if resp.status in (401, 403):
+                raise RoamAuthError("Invalid token or insufficient privileges")
+            if resp.status >= 500:
+                raise RoamServerError(f"Server Error: {resp.status}")
+            if resp.status >= 400:
+                raise RoamAPIError(f"Request failed: {resp.status}")
+            if resp.content_type == 'application/json':
+                return await resp.json()
+            return {}
+    raise RoamAPIError("Max retries reached")
+
+
+async def q_async(session: aiohttp.ClientSession, token: str, graph: str,
+                  query: str, args: Optional[List[Any]] = None) -> Any:
+    """Asynchronous Datalog query."""
+    url = f'{BASE_URL}/api/graph/{graph}/q'
+    body = {'query': query, 'args': args} if args else {'query': query}
+    result = await _post(session, url, _make_headers(token), body)
+    return result.get('result')
+
+
+async def pull_many_async(session: aiohttp.ClientSession, token: str, graph: str,
+                          pattern: str, eids: List[Any]) -> Any:
+    """Asynchronous pull-many: attributes for a list of entities in one roundtrip."""
+    url = f'{BASE_URL}/api/graph/{graph}/pull-many'
+    body = {'eids': eids, 'selector': pattern}
+    result = await _post(session, url, _make_headers(token), body)
+    return result.get('result')
+
+
+async def create_block_async(session: aiohttp.ClientSession, token: str, graph: str,
+                             body: Dict[str, Any]) -> Dict[str, Any]:
+    """Asynchronous create-block write."""
+    body = dict(body, action='create-block')
+    url = f'{BASE_URL}/api/graph/{graph}/write'
+    return await _post(session, url, _make_headers(token), body)
+
+
+class AsyncRoamAPI:
+    """Coroutine counterpart of RoamAPI for latency-bound batch workloads.
+
+    Use as an async context manager so the underlying session is reused
+    across calls:
+
+        async with AsyncRoamAPI(graph, token) as api:
+            contents = await api.get_blocks_content(block_uids)
+    """
+
+    def __init__(self, graph: str, token: str):
+        self.graph = graph
+        self.__token = token
+        self.__headers = _make_headers(token)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def __aenter__(self) -> 'AsyncRoamAPI':
+        self._session = make_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def q(self, query: str, args: Optional[List[Any]] = None) -> Any:
+        async with self._semaphore:
+            return await q_async(self._session, self.__token, self.graph, query, args)
+
+    async def pull_many(self, pattern: str, eids: List[Any]) -> Any:
+        async with self._semaphore:
+            return await pull_many_async(self._session, self.__token, self.graph, pattern, eids)
+
+    async def create_block(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._semaphore:
+            return await create_block_async(self._session, self.__token, self.graph, body)
+
+    async def get_page_uid(self, page_title: str) -> Optional[str]:
+        return await self.q(
+            '[:find ?uid . :in $ ?title :where [?e :node/title ?title] [?e :block/uid ?uid]]',
+            [page_title])
+
+    async def get_block_uids(self, page_title: str) -> List[str]:
+        return await self.q(
+            '[:find [?uid ...] :in $ ?title :where [?e :node/title ?title] [?e :block/children ?c] [?c :block/uid ?uid]]',
+            [page_title]) or []
+
+    async def get_block_content(self, block_uid: str) -> Optional[str]:
+        return await self.q(
+            '[:find ?string . :in $ ?uid :where [?b :block/uid ?uid] [?b :block/string ?string]]',
+            [block_uid])
+
+    async def get_blocks_content(self, block_uids: List[str]) -> List[Optional[str]]:
+        """Fetch the contents of many blocks in a single pull-many roundtrip.
+
+        One request carries all the UIDs, so cost is dominated by payload
+        size rather than per-UID round-trips; results come back in input
+        order with None for UIDs that don't resolve."""
+        if not block_uids:
+            return []
+        rows = await self.pull_many(
+            '[:block/uid :block/string]',
+            [f'[:block/uid "{uid}"]' for uid in block_uids]) or []
+        by_uid = {row[':block/uid']: row.get(':block/string')
+                  for row in rows if row}
+        return [by_uid.get(uid) for uid in block_uids]
+
+    async def add_block(self, parent_uid: str, content: str, order: Any = 'last') -> Dict[str, Any]:
+        return await self.create_block({
+            'location': {'parent-uid': parent_uid, 'order': order},
+            'block': {'string': content}
+        })
+
+    async def pipeline_writes(self, bodies: List[Dict[str, Any]],
+                              max_outstanding: int = 8) -> List[Dict[str, Any]]:
+        """Submit independent create-block writes with bounded in-flight depth.
+
+        Writes that do not depend on each other's responses (e.g. siblings
+        addressed by page-title or a known parent-uid with explicit order
+        fields) should not serialize on round-trips. Up to max_outstanding
+        requests stay in flight at once; results come back in input order."""
+        semaphore = asyncio.Semaphore(max_outstanding)
+
+        async def submit(body: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.create_block(body)
+
+        return await asyncio.gather(*[submit(body) for body in bodies])
+
+    async def wait_for_page(self, page_title: str, max_wait: float = 3.0) -> Optional[str]:
+        """Poll for a page UID with exponential backoff instead of a fixed sleep.
+
+        Read-after-write consistency usually lands well under a second;
+        polling returns as soon as the page is visible rather than paying
+        a worst-case fixed delay."""
+        delay = 0.1
+        waited = 0.0
+        while True:
+            uid = await self.get_page_uid(page_title)
+            if uid or waited >= max_wait:
+                return uid
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, max_wait - waited)
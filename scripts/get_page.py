@@ -14,20 +14,14 @@ import os
 import sys
 import json
 import argparse
-from dotenv import load_dotenv
-
-# Add the parent directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from _bootstrap import load_env
 from scripts.roamresearch import RoamAPI
 
-# Load environment variables from the parent directory
-dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-load_dotenv(dotenv_path)
-
-ROAM_API_TOKEN = os.getenv('ROAM_API_TOKEN')
-ROAM_GRAPH_NAME = os.getenv('ROAM_GRAPH_NAME')
-roam = RoamAPI(ROAM_GRAPH_NAME, ROAM_API_TOKEN)
+def _get_roam():
+	"""Build the API client after argparse has run, reading .env only if needed."""
+	load_env()
+	return RoamAPI(os.getenv('ROAM_GRAPH_NAME'), os.getenv('ROAM_API_TOKEN'))
 
 def write_to_file(content, filename):
 	with open(filename, 'w', encoding='utf-8') as f:
@@ -42,7 +36,7 @@ if __name__ == "__main__":
 
 	args = parser.parse_args()
 
-	result = roam.get_page(args.query, args.prefix, args.format)
+	result = _get_roam().get_page(args.query, args.prefix, args.format)
 	if result:
 		if args.output_file:
 			write_to_file(result, args.output_file)
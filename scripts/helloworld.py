@@ -11,14 +11,16 @@ import sys
 from dotenv import load_dotenv
 from roamClient import initialize_graph, create_page, create_block, q
 
-# Load environment variables
-load_dotenv()
-
 # Set up logging with line numbers
 logging.basicConfig(level=logging.DEBUG,
 					format='%(asctime)s - %(levelname)s - %(message)s at Line %(lineno)d')
 
 def main():
+	# Load environment variables lazily; skip the .env read entirely when
+	# the token is already in the environment
+	if 'ROAM_API_TOKEN' not in os.environ:
+		load_dotenv(override=False)
+
 	# Initialize the RoamBackendClient
 	token = os.getenv('ROAM_API_TOKEN')
 	graph = os.getenv('ROAM_GRAPH_NAME')
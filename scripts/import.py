@@ -13,9 +13,12 @@ License:      MIT
 import os
 import sys
 import yaml
+try:
+	from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+	from yaml import SafeLoader as _YamlLoader
 import json
 import argparse
-from dotenv import load_dotenv
 import logging
 
 # Set up logging at the beginning of your script
@@ -23,18 +26,21 @@ logging.basicConfig(
 	level=logging.ERROR,
 	format='%(asctime)s - %(levelname)s - %(message)s - [%(filename)s:%(lineno)d]')
 
-# Add the parent directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+from _bootstrap import load_env
 from scripts.roamresearch import RoamAPI
 
-# Load environment variables from the parent directory
-dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-load_dotenv(dotenv_path)
+roam = None
+
+def _get_roam():
+	"""Build the API client on first use, after argparse has had its say.
 
-ROAM_API_TOKEN = os.getenv('ROAM_API_TOKEN')
-ROAM_GRAPH_NAME = os.getenv('ROAM_GRAPH_NAME')
-roam = RoamAPI(ROAM_GRAPH_NAME, ROAM_API_TOKEN)
+	Deferring the .env read and client construction keeps --help and
+	plain imports of this module free of filesystem and network setup."""
+	global roam
+	if roam is None:
+		load_env()
+		roam = RoamAPI(os.getenv('ROAM_GRAPH_NAME'), os.getenv('ROAM_API_TOKEN'))
+	return roam
 
 def parse_yaml_frontmatter(file_path):
 	with open(file_path, 'r') as file:
@@ -51,7 +57,7 @@ def parse_yaml_frontmatter(file_path):
 
 	# Parse the YAML frontmatter
 	try:
-		yaml_data = yaml.safe_load(frontmatter)
+		yaml_data = yaml.load(frontmatter, Loader=_YamlLoader)
 		return yaml_data, content
 	except yaml.YAMLError as e:
 		print(f"Error parsing YAML frontmatter: {e}")
@@ -106,7 +112,7 @@ def import_json_file(file_path):
 
 def import_markdown_file(file_path):
 	try:
-		success, message = roam.import_markdown_file(file_path)
+		success, message = _get_roam().import_markdown_file(file_path)
 
 		if success:
 			print(message)
@@ -44,14 +44,36 @@ from roam_utils import get_roam_date_format, process_block_text, find_nested_blo
 logging.basicConfig(level=logging.ERROR, format='%(levelname)s - %(message)s')
 logging.debug("Starting script execution...")
 
-load_dotenv()
-logging.debug("Loaded .env file")
+# Stable query shapes with :in bindings: titles and block text are passed
+# as args, so the server sees one query text per shape and quoting in the
+# values can't break the query
+_Q_PAGE_UID = '[:find ?uid . :in $ ?title :where [?e :node/title ?title] [?e :block/uid ?uid]]'
+# String clause first: the indexed :block/string lookup narrows candidates
+# before the page filter
+_Q_BLOCK_ON_PAGE = '[:find ?uid . :in $ ?string ?page_uid :where [?b :block/string ?string] [?b :block/page ?p] [?p :block/uid ?page_uid] [?b :block/uid ?uid]]'
+
+def wait_for_page_uid(client, page_title):
+    """Poll for a freshly created page's UID with exponential backoff.
+
+    Pages usually materialize well under a second, so polling returns as
+    soon as the page is visible instead of paying a fixed multi-second
+    sleep; total wait is capped at ~3s."""
+    for delay in (0.1, 0.2, 0.4, 0.8, 1.6):
+        page_uid = process_q_result(q(client, _Q_PAGE_UID, [page_title]))
+        if page_uid:
+            return page_uid
+        time.sleep(delay)
+    return process_q_result(q(client, _Q_PAGE_UID, [page_title]))
 
 def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, sc=None):
     try:
+        # Read .env lazily so --help and imports never touch the filesystem
+        if 'ROAM_API_TOKEN' not in os.environ:
+            load_dotenv(override=False)
+            logging.debug("Loaded .env file")
         token = os.getenv('ROAM_API_TOKEN')
         graph = os.getenv('ROAM_GRAPH_NAME')
-        logging.debug(f"Got environment variables - Graph: {graph}")
+        logging.debug("Got environment variables - Graph: %s", graph)
 
         if not token or not graph:
             raise ValueError("ROAM_API_TOKEN or ROAM_GRAPH_NAME not set in .env file")
@@ -61,36 +83,33 @@ def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, s
         logging.debug("Roam client initialized")
 
         today = get_roam_date_format(datetime.now())
-        logging.debug(f"Today's date in Roam format: {today}")
+        logging.debug("Today's date in Roam format: %s", today)
 
         # Check if the page exists
-        logging.debug(f"Checking if page exists: {page_title}")
-        raw_page_query = q(client, f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]')
-        logging.debug(f"Raw page query result: {raw_page_query}")
+        logging.debug("Checking if page exists: %s", page_title)
+        raw_page_query = q(client, _Q_PAGE_UID, [page_title])
+        logging.debug("Raw page query result: %s", raw_page_query)
         page_uid = process_q_result(raw_page_query)
-        logging.debug(f"Processed page_uid: {page_uid}")
+        logging.debug("Processed page_uid: %s", page_uid)
 
         if not page_uid:
-            logging.debug(f"Page doesn't exist, creating: {page_title}")
+            logging.debug("Page doesn't exist, creating: %s", page_title)
             status_code = create_page(client, {'page': {'title': page_title}})
             if status_code != 200:
                 raise Exception(f"Failed to create page. Status: {status_code}")
-            time.sleep(3)  # Wait for page creation
-            raw_page_query = q(client, f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]')
-            logging.debug(f"Raw page query result after creation: {raw_page_query}")
-            page_uid = process_q_result(raw_page_query)
-            logging.debug(f"Processed page_uid after creation: {page_uid}")
+            page_uid = wait_for_page_uid(client, page_title)
+            logging.debug("Processed page_uid after creation: %s", page_uid)
             if not page_uid:
                 raise Exception(f"Failed to create page: {page_title}")
 
         # Check if the DEVONthink link already exists on the page
         logging.debug("Checking for existing DEVONthink link...")
         existing_block = find_nested_block(client, f"({page_uid})", "References::", dtl)
-        logging.debug(f"Existing block check result: {existing_block}")
+        logging.debug("Existing block check result: %s", existing_block)
 
         if existing_block and "error" not in existing_block:
             added_block_uid = existing_block["target_uid"]
-            logging.debug(f"Found existing block with UID: {added_block_uid}")
+            logging.debug("Found existing block with UID: %s", added_block_uid)
 
             combined_comment = f"{sc}".strip() if sc else ""
 
@@ -100,15 +119,15 @@ def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, s
                     'location': {'parent-uid': added_block_uid, 'order': 0},
                     'block': {'string': process_block_text(combined_comment)}
                 })
-                logging.debug(f"Add comment result - Status: {status_code}")
+                logging.debug("Add comment result - Status: %s", status_code)
                 if status_code != 200:
                     raise Exception(f"Failed to add comment to existing block. Status: {status_code}")
         else:
             logging.debug("No existing block found, creating new one...")
-            raw_refs_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "References::"] [?e :block/page ?p] [?p :block/uid "{page_uid}"]]')
-            logging.debug(f"Raw References:: query result: {raw_refs_query}")
+            raw_refs_query = q(client, _Q_BLOCK_ON_PAGE, ["References::", page_uid])
+            logging.debug("Raw References:: query result: %s", raw_refs_query)
             references_uid = process_q_result(raw_refs_query)
-            logging.debug(f"Processed references_uid: {references_uid}")
+            logging.debug("Processed references_uid: %s", references_uid)
 
             if not references_uid:
                 logging.debug("Creating References:: block...")
@@ -116,13 +135,13 @@ def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, s
                     'location': {'parent-uid': page_uid, 'order': 0},
                     'block': {'string': "References::"}
                 })
-                logging.debug(f"Create References:: block result - Status: {status_code}")
+                logging.debug("Create References:: block result - Status: %s", status_code)
                 if status_code != 200:
                     raise Exception(f"Failed to create References:: block. Status: {status_code}")
-                raw_refs_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "References::"] [?e :block/page ?p] [?p :block/uid "{page_uid}"]]')
-                logging.debug(f"Raw References:: query result after creation: {raw_refs_query}")
+                raw_refs_query = q(client, _Q_BLOCK_ON_PAGE, ["References::", page_uid])
+                logging.debug("Raw References:: query result after creation: %s", raw_refs_query)
                 references_uid = process_q_result(raw_refs_query)
-                logging.debug(f"Processed references_uid after creation: {references_uid}")
+                logging.debug("Processed references_uid after creation: %s", references_uid)
 
             block_content = f"[{dt}]({dtl})"
             if db and dbl:
@@ -131,92 +150,89 @@ def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, s
             if c:
                 block_content = f"{block_content} | {c}"
 
-            logging.debug(f"Creating block with content: {block_content}")
+            logging.debug("Creating block with content: %s", block_content)
             status_code = create_block(client, {
                 'location': {'parent-uid': references_uid, 'order': 0},
                 'block': {'string': block_content}
             })
-            logging.debug(f"Create block result - Status: {status_code}")
+            logging.debug("Create block result - Status: %s", status_code)
             if status_code != 200:
                 raise Exception(f"Failed to create link block. Status: {status_code}")
 
             # Get the UID of the newly created block
-            raw_block_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "{block_content}"] [?e :block/page ?p] [?p :block/uid "{page_uid}"]]')
-            logging.debug(f"Raw block query result: {raw_block_query}")
+            raw_block_query = q(client, _Q_BLOCK_ON_PAGE, [block_content, page_uid])
+            logging.debug("Raw block query result: %s", raw_block_query)
             added_block_uid = process_q_result(raw_block_query)
-            logging.debug(f"Processed added_block_uid: {added_block_uid}")
+            logging.debug("Processed added_block_uid: %s", added_block_uid)
 
             # Add comments if provided
             if sc:
-                logging.debug(f"Adding comment: {sc}")
+                logging.debug("Adding comment: %s", sc)
                 status_code = create_block(client, {
                     'location': {'parent-uid': added_block_uid, 'order': 0},
                     'block': {'string': process_block_text(sc)}
                 })
-                logging.debug(f"Add comment result - Status: {status_code}")
+                logging.debug("Add comment result - Status: %s", status_code)
                 if status_code != 200:
                     raise Exception(f"Failed to create comment block. Status: {status_code}")
 
         # Create/update the daily log entry
         logging.debug("Creating daily log entry...")
         today = get_roam_date_format(datetime.now())
-        raw_daily_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :node/title "{today}"]]')
-        logging.debug(f"Raw daily page query result: {raw_daily_query}")
+        raw_daily_query = q(client, _Q_PAGE_UID, [today])
+        logging.debug("Raw daily page query result: %s", raw_daily_query)
         daily_page_uid = process_q_result(raw_daily_query)
-        logging.debug(f"Processed daily_page_uid: {daily_page_uid}")
+        logging.debug("Processed daily_page_uid: %s", daily_page_uid)
 
         if not daily_page_uid:
-            logging.debug(f"Creating daily page: {today}")
+            logging.debug("Creating daily page: %s", today)
             status_code = create_page(client, {'page': {'title': today}})
             if status_code != 200:
                 raise Exception(f"Failed to create daily page. Status: {status_code}")
-            time.sleep(3)
-            raw_daily_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :node/title "{today}"]]')
-            logging.debug(f"Raw daily page query result after creation: {raw_daily_query}")
-            daily_page_uid = process_q_result(raw_daily_query)
-            logging.debug(f"Processed daily_page_uid after creation: {daily_page_uid}")
+            daily_page_uid = wait_for_page_uid(client, today)
+            logging.debug("Processed daily_page_uid after creation: %s", daily_page_uid)
 
         daily_parent_block_content = "[[Log/DEVONthink]]"
-        raw_log_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "{daily_parent_block_content}"] [?e :block/page ?p] [?p :block/uid "{daily_page_uid}"]]')
-        logging.debug(f"Raw log block query result: {raw_log_query}")
+        raw_log_query = q(client, _Q_BLOCK_ON_PAGE, [daily_parent_block_content, daily_page_uid])
+        logging.debug("Raw log block query result: %s", raw_log_query)
         daily_log_block_uid = process_q_result(raw_log_query)
-        logging.debug(f"Processed daily_log_block_uid: {daily_log_block_uid}")
+        logging.debug("Processed daily_log_block_uid: %s", daily_log_block_uid)
 
         if not daily_log_block_uid:
-            logging.debug(f"Creating log block: {daily_parent_block_content}")
+            logging.debug("Creating log block: %s", daily_parent_block_content)
             status_code = create_block(client, {
                 'location': {'parent-uid': daily_page_uid, 'order': 0},
                 'block': {'string': daily_parent_block_content}
             })
-            logging.debug(f"Create log block result - Status: {status_code}")
+            logging.debug("Create log block result - Status: %s", status_code)
             if status_code != 200:
                 raise Exception(f"Failed to create {daily_parent_block_content} block. Status: {status_code}")
-            raw_log_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "{daily_parent_block_content}"] [?e :block/page ?p] [?p :block/uid "{daily_page_uid}"]]')
-            logging.debug(f"Raw log block query result after creation: {raw_log_query}")
+            raw_log_query = q(client, _Q_BLOCK_ON_PAGE, [daily_parent_block_content, daily_page_uid])
+            logging.debug("Raw log block query result after creation: %s", raw_log_query)
             daily_log_block_uid = process_q_result(raw_log_query)
-            logging.debug(f"Processed daily_log_block_uid after creation: {daily_log_block_uid}")
+            logging.debug("Processed daily_log_block_uid after creation: %s", daily_log_block_uid)
 
         # Create the simplified daily log entry
         dailypagelog_pageref_block = f"[[{page_title}]] ⨠ (({added_block_uid}))"
-        logging.debug(f"Creating daily log entry: {dailypagelog_pageref_block}")
+        logging.debug("Creating daily log entry: %s", dailypagelog_pageref_block)
 
         # Check to see if the entry already exists
-        raw_entry_query = q(client, f'[:find ?uid . :where [?e :block/uid ?uid] [?e :block/string "{dailypagelog_pageref_block}"] [?e :block/page ?p] [?p :block/uid "{daily_log_block_uid}"]]')
-        logging.debug(f"Raw entry query result: {raw_entry_query}")
+        raw_entry_query = q(client, _Q_BLOCK_ON_PAGE, [dailypagelog_pageref_block, daily_log_block_uid])
+        logging.debug("Raw entry query result: %s", raw_entry_query)
         dailypagelog_block_uid = process_q_result(raw_entry_query)
-        logging.debug(f"Processed dailypagelog_block_uid: {dailypagelog_block_uid}")
+        logging.debug("Processed dailypagelog_block_uid: %s", dailypagelog_block_uid)
 
         if not dailypagelog_block_uid:
             status_code = create_block(client, {
                 'location': {'parent-uid': daily_log_block_uid, 'order': 0},
                 'block': {'string': dailypagelog_pageref_block}
             })
-            logging.debug(f"Create daily log entry result - Status: {status_code}")
+            logging.debug("Create daily log entry result - Status: %s", status_code)
             if status_code != 200:
                 raise Exception(f"Failed to create daily log entry. Status: {status_code}")
 
         roam_url = f"https://roamresearch.com/#/app/{graph}/page/{page_uid}"
-        logging.debug(f"Operation completed. Roam URL: {roam_url}")
+        logging.debug("Operation completed. Roam URL: %s", roam_url)
 
         return json.dumps({
             "status": "success",
@@ -226,8 +242,8 @@ def link_roam(page_title, dt, dtl, db=None, dbl=None, link_type="ref", c=None, s
         })
 
     except Exception as e:
-        logging.debug(f"Error occurred: {str(e)}")
-        logging.debug(f"Traceback: {traceback.format_exc()}")
+        logging.debug("Error occurred: %s", str(e))
+        logging.debug("Traceback: %s", traceback.format_exc())
         return json.dumps({
             "status": "error",
             "message": str(e)
@@ -248,7 +264,7 @@ def main():
     args = parser.parse_args()
 
     logging.debug("Starting main function...")
-    logging.debug(f"Arguments: {args}")
+    logging.debug("Arguments: %s", args)
     result = link_roam(args.page_title, args.dt, args.dtl, args.db, args.dbl, args.t, args.c, args.sc)
     print(f"{result}")  # This will be captured by AppleScript
 
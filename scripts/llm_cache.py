@@ -0,0 +1,91 @@
+"""On-disk response cache for the LLM wrappers in ai-process.py.
+
+Re-running the same prompt chain over the same files — the normal
+rhythm while iterating on a prompt set — pays full API price for
+answers that cannot have changed. Caching on the exact SHA-256 of
+(prompt, content, model) makes those reruns free. Hits are exact-match
+only: a similarity layer over embeddings would need an embedding call
+per lookup plus a vector-index dependency this repo doesn't carry, and
+the rerun workload it would serve is already covered by exact hits.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+_DEFAULT_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'roam-graph-api', 'llm_cache.sqlite3')
+
+
+class ResponseCache:
+    """SQLite-backed exact-match cache keyed by (prompt, content, model).
+
+    Entries expire after ttl seconds (default one day) so stale
+    completions don't outlive prompt iterations indefinitely. Safe for
+    the thread-pooled folder path: one connection guarded by a lock."""
+
+    def __init__(self, path: str = None, ttl: float = 86400):
+        path = path or _DEFAULT_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' response TEXT NOT NULL,'
+            ' created REAL NOT NULL)')
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, content: str, model: str) -> str:
+        payload = '\x00'.join((model, prompt, content)).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, prompt: str, content: str, model: str = ''):
+        key = self._key(prompt, content, model)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            if time.time() - created > self.ttl:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._conn.commit()
+                return None
+            return response
+
+    def set(self, prompt: str, content: str, model: str, response: str) -> None:
+        key = self._key(prompt, content, model)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)',
+                (key, response, time.time()))
+            self._conn.commit()
+
+    def wrap(self, api_function, model: str = ''):
+        """Wrap an ai-process api_function with cache lookups.
+
+        Calls carrying conversation history are passed straight through:
+        the history changes the answer, so only history-free calls are
+        safe to replay from cache."""
+        def wrapper(content, prompt, conversation_history, client, out_fp=None):
+            if conversation_history:
+                return api_function(content, prompt, conversation_history, client, out_fp=out_fp)
+            cached = self.get(prompt, content, model)
+            if cached is not None:
+                if out_fp:
+                    out_fp.write(cached)
+                return cached
+            result = api_function(content, prompt, conversation_history, client, out_fp=out_fp)
+            if result:
+                self.set(prompt, content, model, result)
+            return result
+        return wrapper
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,29 @@
+"""Compatibility alias for roam_backend.
+
+Several scripts import their client helpers under the roamClient name;
+re-exporting here lets them all resolve to the single cached
+roam_backend module (one parse/compile, one pooled-session client
+factory) instead of failing or carrying private copies.
+"""
+
+from roam_backend import (
+    RoamBackendClient,
+    RoamAPIError,
+    RoamAuthError,
+    RoamServerError,
+    RoamHTTPError,
+    RoamValidationError,
+    initialize_graph,
+    get_client,
+    q,
+    pull,
+    pull_many,
+    create_block,
+    batch_actions,
+    move_block,
+    update_block,
+    delete_block,
+    create_page,
+    update_page,
+    delete_page,
+)
@@ -12,14 +12,35 @@ Copyright (c) 2024
 
 from typing import Optional, Dict, Any, List, Union, Callable
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import random
 import re
 import asyncio
 import aiohttp
 from datetime import datetime
 from functools import lru_cache
 from schema import Schema, Or, And, Use, Optional as SchemaOptional, SchemaError
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> bytes:
+        """Encode request bodies with orjson's C serializer when installed."""
+        return orjson.dumps(obj)
+
+    def _json_loads(data: bytes) -> Any:
+        """Decode response bodies with orjson when installed."""
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        """stdlib fallback; orjson is an optional speedup, not a dependency."""
+        return json.dumps(obj).encode('utf-8')
+
+    def _json_loads(data: bytes) -> Any:
+        """stdlib fallback; orjson is an optional speedup, not a dependency."""
+        return json.loads(data)
 
 class RoamAPIError(Exception):
     """Base exception for Roam API errors"""
@@ -33,10 +54,21 @@ class RoamServerError(RoamAPIError):
     """Raised when server encounters an error"""
     pass
 
+class RoamHTTPError(RoamAPIError):
+    """HTTP failure carrying the status code and any Retry-After hint"""
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
 class RoamValidationError(RoamAPIError):
     """Raised when input validation fails"""
     pass
 
+# Redirect Location parser, compiled once at import; [^:]* instead of .*?
+# keeps the match linear with no backtracking
+_PEER_RE = re.compile(r'https://(peer-\d+)[^:]*:(\d+)')
+
 class RoamBackendClient:
     """Enhanced client for interacting with Roam Research API"""
     
@@ -52,43 +84,135 @@ class RoamBackendClient:
         self.__base_url = 'https://api.roamresearch.com'
         self.max_retries = max_retries
         self.cache_size = cache_size
+        # Persistent session: keep-alive connection reuse amortizes the
+        # TCP+TLS handshake across calls; the adapter retries transient
+        # throttling/server errors with backoff before surfacing them
         self.__session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=64,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=0.2,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=['POST'],
+                respect_retry_after_header=True,
+                # On exhaustion, hand the final throttled response back
+                # instead of raising RetryError, so __handle_error can map
+                # it to RoamHTTPError with its Retry-After for the callers
+                # that coordinate backoff on it
+                raise_on_status=False))
+        self.__session.mount('https://', adapter)
+        self.__asession: Optional[aiohttp.ClientSession] = None
+        self.__aloop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_session(self) -> requests.Session:
+        """Expose the pooled session so callers can mount custom adapters."""
+        return self.__session
+
+    def close(self) -> None:
+        """Release the pooled connections held by the sessions.
+
+        The async session is torn down best-effort here; callers still
+        inside a running loop should await aclose() instead."""
+        self.__session.close()
+        self.__drop_asession()
+
+    def __enter__(self) -> 'RoamBackendClient':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
     def __del__(self):
-        self.__session.close()
+        self.close()
+
+    def __drop_asession(self) -> None:
+        """Discard the cached async session without needing its event loop.
+
+        ClientSession.close() is a coroutine bound to the session's loop,
+        which at this point may already be gone (asyncio.run tears its
+        loop down); detach() marks the session closed synchronously and
+        the connector's sync close() frees any remaining transports, so
+        neither object warns at GC time."""
+        asession, self.__asession = self.__asession, None
+        self.__aloop = None
+        if asession is None or asession.closed:
+            return
+        try:
+            connector = asession.connector
+            asession.detach()
+            if connector is not None:
+                connector.close()
+        except Exception:
+            pass
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def __make_request(self, path: str, body: Dict[str, Any], method: str = 'POST') -> tuple:
-        """Prepare request URL and headers with retry logic"""
+        """Prepare request URL and headers"""
         base_url = self.__cache.get(self.graph, self.__base_url)
         return (f"{base_url}{path}", method, self.__headers)
 
     def __handle_error(self, resp: requests.Response) -> None:
         """Enhanced error handling with detailed messages"""
+        retry_after = None
+        header = resp.headers.get('Retry-After')
+        if header:
+            try:
+                retry_after = float(header)
+            except ValueError:
+                pass
         error_map = {
             400: lambda: RoamValidationError(f"Bad Request: {resp.json()}"),
             401: lambda: RoamAuthError("Invalid token or insufficient privileges"),
             403: lambda: RoamAuthError("Access forbidden - check graph permissions"),
             404: lambda: RoamAPIError("Resource not found"),
-            429: lambda: RoamAPIError("Rate limit exceeded - please wait"),
+            429: lambda: RoamHTTPError("Rate limit exceeded - please wait", 429, retry_after),
             500: lambda: RoamServerError(f"Server Error: {resp.json()}"),
-            503: lambda: RoamServerError("Graph not ready, please retry in a few seconds")
+            503: lambda: RoamHTTPError("Graph not ready, please retry in a few seconds", 503, retry_after)
         }
         error_class = error_map.get(resp.status_code, lambda: RoamAPIError(f"Unknown error: {resp.status_code}"))
         raise error_class()
 
-    @lru_cache(maxsize=128)
+    def __handle_async_error(self, resp: 'aiohttp.ClientResponse') -> None:
+        """__handle_error counterpart for aiohttp responses.
+
+        aiohttp exposes .status rather than .status_code and its .json()
+        is a coroutine, so the requests-based mapping can't be shared;
+        statuses map to the same exception types."""
+        retry_after = None
+        header = resp.headers.get('Retry-After')
+        if header:
+            try:
+                retry_after = float(header)
+            except ValueError:
+                pass
+        if resp.status == 400:
+            raise RoamValidationError(f"Bad Request: {resp.status}")
+        if resp.status in (401, 403):
+            raise RoamAuthError("Invalid token or insufficient privileges")
+        if resp.status == 404:
+            raise RoamAPIError("Resource not found")
+        if resp.status == 429:
+            raise RoamHTTPError("Rate limit exceeded - please wait", 429, retry_after)
+        if resp.status == 503:
+            raise RoamHTTPError("Graph not ready, please retry in a few seconds", 503, retry_after)
+        if resp.status >= 500:
+            raise RoamServerError(f"Server Error: {resp.status}")
+        raise RoamAPIError(f"Unknown error: {resp.status}")
+
     def call(self, path: str, method: str, body: Dict[str, Any]) -> requests.Response:
-        """Make API call with automatic redirect handling and caching"""
+        """Make API call with automatic redirect handling"""
         url, method, headers = self.__make_request(path, body, method)
-        resp = self.__session.post(url, headers=headers, json=body, allow_redirects=False)
+        # Pre-serialized bytes skip requests' json.dumps plus its extra
+        # UTF-8 encode; the session headers already declare JSON content
+        resp = self.__session.post(url, headers=headers, data=_json_dumps(body), allow_redirects=False)
         
         if resp.is_redirect or resp.is_permanent_redirect:
             location = resp.headers.get('Location')
             if not location:
                 raise RoamAPIError("Redirect location not provided")
             
-            match = re.search(r'https://(peer-\d+).*?:(\d+).*', location)
+            match = _PEER_RE.search(location)
             if not match:
                 raise RoamAPIError("Invalid redirect URL format")
             
@@ -104,12 +228,56 @@ class RoamBackendClient:
     async def async_call(self, path: str, method: str, body: Dict[str, Any]) -> Dict[str, Any]:
         """Asynchronous API call for better performance"""
         url, method, headers = self.__make_request(path, body, method)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=body) as resp:
+        # One shared pooled ClientSession: opening a session per call paid
+        # a fresh TCP+TLS handshake every time, which defeats the point of
+        # issuing the calls concurrently in the first place. A session is
+        # bound to the loop that created it (and .closed stays False after
+        # that loop dies), so a fresh one is made whenever the running
+        # loop differs — back-to-back asyncio.run() calls each get a
+        # working session instead of "Event loop is closed" errors.
+        loop = asyncio.get_running_loop()
+        if self.__asession is None or self.__asession.closed or self.__aloop is not loop:
+            self.__drop_asession()
+            self.__asession = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=64))
+            self.__aloop = loop
+        # The sync path gets transient-error retries from the session's
+        # HTTPAdapter; aiohttp has no equivalent, so back off here on
+        # throttling responses, honoring Retry-After when the server
+        # sends one and adding jitter so fanned-out coroutines don't
+        # retry in lockstep
+        for attempt in range(self.max_retries + 1):
+            async with self.__asession.post(url, headers=headers, json=body) as resp:
+                if resp.status in (429, 502, 503, 504) and attempt < self.max_retries:
+                    header = resp.headers.get('Retry-After')
+                    try:
+                        delay = float(header) if header else min(10.0, 0.5 * (2 ** attempt))
+                    except ValueError:
+                        delay = min(10.0, 0.5 * (2 ** attempt))
+                    await asyncio.sleep(delay + random.uniform(0, 0.25))
+                    continue
                 if not resp.ok:
-                    self.__handle_error(resp)
+                    self.__handle_async_error(resp)
                 return await resp.json()
 
+    async def aclose(self) -> None:
+        """Close the shared async session, if one was opened.
+
+        This is the graceful path while the session's loop is still
+        running; close()/__del__ fall back to a synchronous best-effort
+        teardown for sessions whose loop is already gone."""
+        if self.__asession is not None and not self.__asession.closed:
+            await self.__asession.close()
+        self.__asession = None
+        self.__aloop = None
+
+    def batch_actions(self, actions: List[Dict[str, Any]]) -> int:
+        """Execute multiple write actions in a single HTTP request"""
+        path = f'/api/graph/{self.graph}/write'
+        body = {'action': 'batch-actions', 'actions': actions}
+        resp = self.call(path, 'POST', body)
+        return resp.status_code
+
     def batch_operation(self, operations: List[Dict[str, Any]]) -> List[int]:
         """Execute multiple operations in batch"""
         results = []
@@ -194,7 +362,7 @@ def q(client: RoamBackendClient, query: str, args: Optional[Dict[str, Any]] = No
     path = f'/api/graph/{client.graph}/q'
     body = {'query': query, 'args': args} if args else {'query': query}
     resp = client.call(path, 'POST', body)
-    return resp.json()['result']
+    return _json_loads(resp.content)['result']
 
 def pull(client: RoamBackendClient, pattern: str, eid: str) -> Any:
     """Pull data for a single entity with validation"""
@@ -203,7 +371,7 @@ def pull(client: RoamBackendClient, pattern: str, eid: str) -> Any:
     path = f'/api/graph/{client.graph}/pull'
     body = {'eid': eid, 'selector': pattern}
     resp = client.call(path, 'POST', body)
-    return resp.json()['result']
+    return _json_loads(resp.content)['result']
 
 def pull_many(client: RoamBackendClient, pattern: str, eids: List[str]) -> Any:
     """Pull data for multiple entities with validation"""
@@ -212,13 +380,18 @@ def pull_many(client: RoamBackendClient, pattern: str, eids: List[str]) -> Any:
     path = f'/api/graph/{client.graph}/pull-many'
     body = {'eids': eids, 'selector': pattern}
     resp = client.call(path, 'POST', body)
-    return resp.json()['result']
+    return _json_loads(resp.content)['result']
 
 # Enhanced schemas with more validation
-LOCATION_SCHEMA = Schema({
-    'parent-uid': And(str, len),
-    'order': Or(int, And(str, Use(int)))
-})
+ORDER_SCHEMA = Or(int, And(str, lambda s: s in ('first', 'last')), And(str, Use(int)))
+
+# A location may address its parent by block UID or by page title; the
+# page-title form lets Roam upsert the page (e.g. today's daily note)
+# in the same write
+LOCATION_SCHEMA = Schema(Or(
+    {'parent-uid': And(str, len), 'order': ORDER_SCHEMA},
+    {'page-title': And(str, len), 'order': ORDER_SCHEMA}
+))
 
 BLOCK_SCHEMA = Schema({
     'string': And(str, len),
@@ -229,27 +402,66 @@ BLOCK_SCHEMA = Schema({
     SchemaOptional('children-view-type'): And(str, lambda s: s in ['document', 'bullet', 'numbered'])
 })
 
+# Per-action schemas built once at import: Schema() construction walks and
+# wraps the whole spec tree, which under bulk writes cost more than the
+# validation itself when rebuilt on every call
+CHILDREN_VIEW_TYPE_SCHEMA = And(str, lambda s: s in ['document', 'bullet', 'numbered'])
+
+CREATE_BLOCK_SCHEMA = Schema({'action': 'create-block', 'location': LOCATION_SCHEMA, 'block': BLOCK_SCHEMA})
+
+MOVE_BLOCK_SCHEMA = Schema({'action': 'move-block', 'location': LOCATION_SCHEMA, 'block': {'uid': And(str, len)}})
+
+UPDATE_BLOCK_SCHEMA = Schema({'action': 'update-block', 'block': {
+    SchemaOptional('string'): And(str, len),
+    'uid': And(str, len),
+    SchemaOptional('open'): bool,
+    SchemaOptional('heading'): And(int, lambda n: 0 <= n <= 3),
+    SchemaOptional('text-align'): str,
+    SchemaOptional('children-view-type'): CHILDREN_VIEW_TYPE_SCHEMA
+}})
+
+DELETE_BLOCK_SCHEMA = Schema({'action': 'delete-block', 'block': {'uid': And(str, len)}})
+
+CREATE_PAGE_SCHEMA = Schema({'action': 'create-page', 'page': {
+    SchemaOptional('uid'): And(str, len),
+    'title': And(str, len),
+    SchemaOptional('children-view-type'): CHILDREN_VIEW_TYPE_SCHEMA
+}})
+
+UPDATE_PAGE_SCHEMA = Schema({'action': 'update-page', 'page': {
+    'uid': And(str, len),
+    SchemaOptional('title'): And(str, len),
+    SchemaOptional('children-view-type'): CHILDREN_VIEW_TYPE_SCHEMA
+}})
+
+DELETE_PAGE_SCHEMA = Schema({'action': 'delete-page', 'page': {'uid': And(str, len)}})
+
+INIT_SCHEMA = Schema({'graph': And(str, len), 'token': And(str, len)})
+
+def _validate(schema: Schema, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a request body, mapping SchemaError to RoamValidationError"""
+    try:
+        return schema.validate(body)
+    except SchemaError as e:
+        raise RoamValidationError(str(e))
+
 # Enhanced operations with validation and error handling
 def create_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Create a new block with validation"""
     body['action'] = 'create-block'
-    schema = Schema({'action': 'create-block', 'location': LOCATION_SCHEMA, 'block': BLOCK_SCHEMA})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(CREATE_BLOCK_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
 
+def batch_actions(client: RoamBackendClient, actions: List[Dict[str, Any]]) -> int:
+    """Execute multiple write actions in one HTTP request"""
+    return client.batch_actions(actions)
+
 def move_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Move an existing block with validation"""
     body['action'] = 'move-block'
-    schema = Schema({'action': 'move-block', 'location': LOCATION_SCHEMA, 'block': {'uid': And(str, len)}})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(MOVE_BLOCK_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
@@ -257,18 +469,7 @@ def move_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
 def update_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Update an existing block with validation"""
     body['action'] = 'update-block'
-    schema = Schema({'action': 'update-block', 'block': {
-        SchemaOptional('string'): And(str, len),
-        'uid': And(str, len),
-        SchemaOptional('open'): bool,
-        SchemaOptional('heading'): And(int, lambda n: 0 <= n <= 3),
-        SchemaOptional('text-align'): str,
-        SchemaOptional('children-view-type'): And(str, lambda s: s in ['document', 'bullet', 'numbered'])
-    }})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(UPDATE_BLOCK_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
@@ -276,11 +477,7 @@ def update_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
 def delete_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Delete a block with validation"""
     body['action'] = 'delete-block'
-    schema = Schema({'action': 'delete-block', 'block': {'uid': And(str, len)}})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(DELETE_BLOCK_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
@@ -288,15 +485,7 @@ def delete_block(client: RoamBackendClient, body: Dict[str, Any]) -> int:
 def create_page(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Create a new page with validation"""
     body['action'] = 'create-page'
-    schema = Schema({'action': 'create-page', 'page': {
-        SchemaOptional('uid'): And(str, len),
-        'title': And(str, len),
-        SchemaOptional('children-view-type'): And(str, lambda s: s in ['document', 'bullet', 'numbered'])
-    }})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(CREATE_PAGE_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
@@ -304,15 +493,7 @@ def create_page(client: RoamBackendClient, body: Dict[str, Any]) -> int:
 def update_page(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Update an existing page with validation"""
     body['action'] = 'update-page'
-    schema = Schema({'action': 'update-page', 'page': {
-        'uid': And(str, len),
-        SchemaOptional('title'): And(str, len),
-        SchemaOptional('children-view-type'): And(str, lambda s: s in ['document', 'bullet', 'numbered'])
-    }})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(UPDATE_PAGE_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
@@ -320,20 +501,21 @@ def update_page(client: RoamBackendClient, body: Dict[str, Any]) -> int:
 def delete_page(client: RoamBackendClient, body: Dict[str, Any]) -> int:
     """Delete a page with validation"""
     body['action'] = 'delete-page'
-    schema = Schema({'action': 'delete-page', 'page': {'uid': And(str, len)}})
-    try:
-        validated_body = schema.validate(body)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_body = _validate(DELETE_PAGE_SCHEMA, body)
     path = f'/api/graph/{client.graph}/write'
     resp = client.call(path, 'POST', validated_body)
     return resp.status_code
 
 def initialize_graph(inp: Dict[str, str]) -> RoamBackendClient:
     """Initialize a new Roam graph client with validation"""
-    schema = Schema({'graph': And(str, len), 'token': And(str, len)})
-    try:
-        validated_input = schema.validate(inp)
-    except SchemaError as e:
-        raise RoamValidationError(str(e))
+    validated_input = _validate(INIT_SCHEMA, inp)
     return RoamBackendClient(validated_input['token'], validated_input['graph'])
+
+@lru_cache(maxsize=8)
+def get_client(graph: str, token: str) -> RoamBackendClient:
+    """Return a process-wide client for the graph, creating it on first use.
+
+    Scripts that build a fresh client per operation pay a new TLS handshake
+    for every call; routing them through this cache shares one pooled
+    Session per (graph, token) pair for the life of the process."""
+    return initialize_graph({'graph': graph, 'token': token})
@@ -64,16 +64,29 @@ class RoamBlock:
             order=result.get('order')
         )
 
+# Patterns compiled once at import instead of per call
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_ROAM_ITALIC_RE = re.compile(r'__([^_]+?)__')
+_ROAM_HIGHLIGHT_RE = re.compile(r'\^\^([^^]+?)\^\^')
+_MD_ITALIC_RE = re.compile(r'\*([^*]+?)\*')
+_MD_HIGHLIGHT_RE = re.compile(r'==([^=]+?)==')
+
+# Date-format tables, built once at import time instead of per call
+_DAY_SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd'}
+_TEEN_DAYS = {11, 12, 13}
+_MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June',
+                'July', 'August', 'September', 'October', 'November', 'December')
+
 class DateUtils:
     """Date-related utility functions"""
-    
+
     @staticmethod
     def is_valid_date_string(date_string: str) -> bool:
         """Enhanced date string validation"""
         if not isinstance(date_string, str):
             return False
             
-        if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_string):
+        if not _ISO_DATE_RE.match(date_string):
             return False
             
         try:
@@ -90,10 +103,11 @@ class DateUtils:
         """Convert date to Roam Research format"""
         if isinstance(date, str):
             return date
-        suffixes = {1: 'st', 2: 'nd', 3: 'rd'}
         day = date.day
-        suffix = suffixes.get(day % 10, 'th') if day not in [11, 12, 13] else 'th'
-        return date.strftime(f"%B {day}{suffix}, %Y")
+        suffix = _DAY_SUFFIXES.get(day % 10, 'th') if day not in _TEEN_DAYS else 'th'
+        # f-string with a precomputed month table skips strftime's locale
+        # machinery entirely
+        return f"{_MONTH_NAMES[date.month - 1]} {day}{suffix}, {date.year}"
 
     @staticmethod
     def get_date_range(start_date: datetime, end_date: datetime) -> List[str]:
@@ -184,10 +198,10 @@ class MarkdownConverter:
             raise ValueError("Input must be a string")
             
         # First handle nested formatting by converting italics
-        text = re.sub(r'__([^_]+?)__', r'*\1*', text)
+        text = _ROAM_ITALIC_RE.sub(r'*\1*', text)
         
         # Then convert highlights
-        text = re.sub(r'\^\^([^^]+?)\^\^', r'==\1==', text)
+        text = _ROAM_HIGHLIGHT_RE.sub(r'==\1==', text)
         
         return text
     
@@ -214,10 +228,10 @@ class MarkdownConverter:
             raise ValueError("Input must be a string")
             
         # First handle nested formatting by converting italics
-        text = re.sub(r'\*([^*]+?)\*', r'__\1__', text)
+        text = _MD_ITALIC_RE.sub(r'__\1__', text)
         
         # Then convert highlights
-        text = re.sub(r'==([^=]+?)==', r'^^\1^^', text)
+        text = _MD_HIGHLIGHT_RE.sub(r'^^\1^^', text)
         
         return text
     
@@ -247,14 +261,14 @@ class MarkdownConverter:
         # Process text in chunks to handle nested formatting correctly
         if to_roam:
             # First convert all italics
-            text = re.sub(r'\*([^*]+?)\*', r'__\1__', text)
+            text = _MD_ITALIC_RE.sub(r'__\1__', text)
             # Then convert all highlights
-            text = re.sub(r'==([^=]+?)==', r'^^\1^^', text)
+            text = _MD_HIGHLIGHT_RE.sub(r'^^\1^^', text)
         else:
             # First convert all italics
-            text = re.sub(r'__([^_]+?)__', r'*\1*', text)
+            text = _ROAM_ITALIC_RE.sub(r'*\1*', text)
             # Then convert all highlights
-            text = re.sub(r'\^\^([^^]+?)\^\^', r'==\1==', text)
+            text = _ROAM_HIGHLIGHT_RE.sub(r'==\1==', text)
             
         return text
 
@@ -404,21 +418,60 @@ class MarkdownConverter:
                     
         return '\n'.join(result)
 
+# Parameterized single-entity lookups shared by page_exists and the
+# stepwise find_nested_block path: one stable query text per shape, with
+# identifiers passed as :in args rather than interpolated literals
+_Q_TITLE_BY_UID = '[:find ?title . :in $ ?uid :where [?e :block/uid ?uid] [?e :node/title ?title]]'
+_Q_UID_BY_TITLE = '[:find ?uid . :in $ ?title :where [?e :node/title ?title] [?e :block/uid ?uid]]'
+_Q_CHILDREN_OF = '[:find ?child_uid ?child_string :in $ ?uid :where [?page :block/uid ?uid] [?page :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]'
+
+# Single-join lookups for find_nested_block: page, parent, and target are
+# resolved in one round-trip instead of four, with the substring matching
+# done server-side instead of filtering child lists in Python
+_NESTED_BLOCK_BY_UID_Q = '''[
+ :find [?title ?parent_uid ?parent_str ?target_uid ?target_str]
+ :in $ ?page_uid ?parent_needle ?target_needle
+ :where
+ [?page :block/uid ?page_uid]
+ [?page :node/title ?title]
+ [?page :block/children ?parent]
+ [?parent :block/string ?parent_str]
+ [(clojure.string/includes? ?parent_str ?parent_needle)]
+ [?parent :block/uid ?parent_uid]
+ [?parent :block/children ?target]
+ [?target :block/string ?target_str]
+ [(clojure.string/includes? ?target_str ?target_needle)]
+ [?target :block/uid ?target_uid]]'''
+_NESTED_BLOCK_BY_TITLE_Q = '''[
+ :find [?page_uid ?parent_uid ?parent_str ?target_uid ?target_str]
+ :in $ ?title ?parent_needle ?target_needle
+ :where
+ [?page :node/title ?title]
+ [?page :block/uid ?page_uid]
+ [?page :block/children ?parent]
+ [?parent :block/string ?parent_str]
+ [(clojure.string/includes? ?parent_str ?parent_needle)]
+ [?parent :block/uid ?parent_uid]
+ [?parent :block/children ?target]
+ [?target :block/string ?target_str]
+ [(clojure.string/includes? ?target_str ?target_needle)]
+ [?target :block/uid ?target_uid]]'''
+
 class GraphUtils:
     """Graph-level utilities"""
-    
+
     @staticmethod
     @validate_input(lambda client, page_identifier: isinstance(page_identifier, str))
     def page_exists(client: Any, page_identifier: str) -> Tuple[bool, Optional[str]]:
         """Enhanced page existence check with validation"""
         if page_identifier.startswith('('):
             page_uid = page_identifier.strip('()')
-            result = q(client, f'[:find ?title . :where [?e :block/uid "{page_uid}"] [?e :node/title ?title]]')
+            result = q(client, _Q_TITLE_BY_UID, [page_uid])
             processed_result = BlockUtils.process_q_result(result)
             return (bool(processed_result), page_uid if processed_result else None)
         else:
             page_title = page_identifier
-            result = q(client, f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]')
+            result = q(client, _Q_UID_BY_TITLE, [page_title])
             processed_result = BlockUtils.process_q_result(result)
             return (bool(processed_result), processed_result)
 
@@ -427,20 +480,40 @@ class GraphUtils:
                          target_string: str) -> Dict[str, Any]:
         """Enhanced nested block finder with better error handling"""
         try:
+            # Fast path: one joined query resolves page, parent, and target
+            # together. An empty result can't say which level was missing,
+            # so misses fall through to the stepwise path below, which
+            # still raises the specific not-found errors.
+            by_uid = page_identifier.startswith('(')
+            ident = page_identifier.strip('()') if by_uid else page_identifier
+            row = q(client,
+                    _NESTED_BLOCK_BY_UID_Q if by_uid else _NESTED_BLOCK_BY_TITLE_Q,
+                    [ident, parent_string, target_string])
+            if row:
+                first, parent_uid, parent_content, target_uid, target_content = row
+                return {
+                    "page_title": first if by_uid else ident,
+                    "page_uid": ident if by_uid else first,
+                    "parent_content": parent_content,
+                    "parent_uid": parent_uid,
+                    "target_uid": target_uid,
+                    "target_content": target_content
+                }
+
             if page_identifier.startswith('('):
                 page_uid = page_identifier.strip('()')
-                page_title_result = q(client, f'[:find ?title . :where [?e :block/uid "{page_uid}"] [?e :node/title ?title]]')
+                page_title_result = q(client, _Q_TITLE_BY_UID, [page_uid])
                 page_title = BlockUtils.process_q_result(page_title_result)
                 if not page_title:
                     raise RoamAPIError(f"Page with UID '{page_uid}' not found.")
             else:
                 page_title = page_identifier
-                page_uid_result = q(client, f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]')
+                page_uid_result = q(client, _Q_UID_BY_TITLE, [page_title])
                 page_uid = BlockUtils.process_q_result(page_uid_result)
                 if not page_uid:
                     raise RoamAPIError(f"Page '{page_title}' not found.")
 
-            child_blocks = q(client, f'[:find ?child_uid ?child_string :where [?page :block/uid "{page_uid}"] [?page :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]')
+            child_blocks = q(client, _Q_CHILDREN_OF, [page_uid])
 
             parent_block = next((block for block in child_blocks if parent_string in block[1]), None)
             if not parent_block:
@@ -448,7 +521,7 @@ class GraphUtils:
 
             parent_uid, parent_content = parent_block
 
-            parent_child_blocks = q(client, f'[:find ?child_uid ?child_string :where [?parent :block/uid "{parent_uid}"] [?parent :block/children ?child] [?child :block/uid ?child_uid] [?child :block/string ?child_string]]')
+            parent_child_blocks = q(client, _Q_CHILDREN_OF, [parent_uid])
 
             target_block = next((block for block in parent_child_blocks if target_string in block[1]), None)
             if not target_block:
@@ -509,3 +582,26 @@ def log_roam_operation(operation: str, status: str, details: Optional[str] = Non
     if details:
         log_message += f" - Details: {details}"
     logger.info(log_message)
+
+# Module-level aliases: the CLI scripts import these helpers as plain
+# functions; binding the static methods once here lets those imports
+# resolve without each script reaching through the class attribute per call
+is_valid_date_string = DateUtils.is_valid_date_string
+get_roam_date_format = DateUtils.get_roam_date_format
+get_date_range = DateUtils.get_date_range
+extract_uid = BlockUtils.extract_uid
+process_q_result = BlockUtils.process_q_result
+page_exists = GraphUtils.page_exists
+find_nested_block = GraphUtils.find_nested_block
+
+_TODO_MARKER_RE = re.compile(r'(?m)^(\s*)\[(x?)\]')
+
+def process_block_text(block_text: str) -> str:
+    """Expand literal \\n escapes and map [] / [x] markers to Roam TODO/DONE."""
+    block_text = block_text.replace('\\n', '\n')
+    # Texts without any bracket (the common case) skip the regex pass
+    if '[' not in block_text:
+        return block_text
+    return _TODO_MARKER_RE.sub(
+        lambda m: m.group(1) + ('{{[[DONE]]}}' if m.group(2) else '{{[[TODO]]}}'),
+        block_text)
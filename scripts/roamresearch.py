@@ -10,114 +10,485 @@ Version:      1.2
 License:      MIT
 """
 
+import asyncio
+import functools
+import os
+import threading
 import time
 import datetime
 import re
 import json
+import secrets
+import itertools
 import yaml
-from roam_backend import initialize_graph, create_block, q
+try:
+	# LibYAML's C loader parses frontmatter ~10x faster when present;
+	# same safe-construction semantics as SafeLoader
+	from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+	from yaml import SafeLoader as _YamlLoader
+from concurrent.futures import Future, ThreadPoolExecutor
+from roam_backend import get_client, create_block, q, RoamHTTPError
+from roam_backend import create_page as backend_create_page
+from client_async import AsyncRoamAPI
 import logging
 import random
+import warnings
+
+try:
+	import orjson
+
+	def _dumps(obj, pretty=False):
+		"""Serialize via orjson's C encoder when it's installed."""
+		return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+except ImportError:
+	def _dumps(obj, pretty=False):
+		"""stdlib fallback; orjson is an optional speedup, not a dependency."""
+		return json.dumps(obj, indent=2 if pretty else None)
+
+def _gen_uid():
+	"""Generate a 9-character block UID client-side (Roam accepts user-supplied UIDs)."""
+	return re.sub(r'[^A-Za-z0-9]', '', secrets.token_urlsafe(12))[:9]
+
+_BACKOFF_BASE = 1.0
+_BACKOFF_CAP = 300.0
+
+def _sleep_backoff(attempt):
+	"""Sleep with AWS full-jitter backoff: uniform(0, min(cap, base * 2^attempt)).
+
+	Full jitter spreads retries across the whole window, so many clients
+	backing off from the same 503 don't wake up in lockstep the way a
+	fixed base + small jitter (or a flat retry interval) makes them."""
+	time.sleep(random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt))))
+
+# Markdown parsing patterns, compiled once instead of per line
+_RE_NUMBERED = re.compile(r'^\d+\.')
+_RE_NUMBERED_STRIP = re.compile(r'^\d+\.\s*')
+
+# Page-identifier patterns shared by get_or_create_page_uid and get_page
+def _is_iso_date(s):
+	"""True for strings shaped like YYYY-MM-DD.
+
+	A handful of branch-predicted C-level string calls; cheaper than even a
+	precompiled regex for this hot gate (strptime still validates ranges)."""
+	return (len(s) == 10 and s[4] == '-' and s[7] == '-'
+		and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit())
+
+def _is_uid9(s):
+	"""True for strings shaped like a 9-character Roam block/page UID."""
+	return len(s) == 9 and s.isalnum() and s.isascii()
+
+# Leading [] / [x] checkbox markers, matched across all lines at once
+_RE_TODO = re.compile(r'(?m)^(\s*)\[(x?)\]')
+
+# Ordinal suffixes for daily-note titles, built once at import
+_DAY_SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd'}
+
+@functools.lru_cache(maxsize=512)
+def _roam_date_string(year, month, day):
+	"""Format a (year, month, day) as a Roam daily-note title, memoized.
+
+	Keyed on the plain tuple so the cache is shared across RoamAPI
+	instances and hits are a dict lookup; the daily-note path formats
+	the same handful of dates over and over during imports."""
+	suffix = _DAY_SUFFIXES.get(day % 10, 'th') if day not in (11, 12, 13) else 'th'
+	return datetime.date(year, month, day).strftime(f"%B {day}{suffix}, %Y")
+
+# Sentinel cached for lookups that came back empty, so repeated misses
+# don't re-hit the API; expires faster than positive entries
+_NEG = object()
+
+class _TTLCache:
+	"""Minimal bounded TTL cache: dict keyed access plus per-entry expiry.
+
+	Kept dependency-free on purpose (the repo only ships a short
+	requirements list); eviction is expired-first, then FIFO once the
+	size bound is reached. Thread-safe: the write fan-out paths share
+	these caches across pool workers, and eviction iterates the dict, so
+	unsynchronized mutation could corrupt or crash it mid-scan."""
+
+	def __init__(self, maxsize, ttl):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self._data = {}  # key -> (expires_at, value)
+		self._lock = threading.Lock()
+
+	def get(self, key, default=None):
+		with self._lock:
+			entry = self._data.get(key)
+			if entry is None:
+				return default
+			expires_at, value = entry
+			if time.monotonic() >= expires_at:
+				del self._data[key]
+				return default
+			return value
+
+	def set(self, key, value, ttl=None):
+		with self._lock:
+			if len(self._data) >= self.maxsize:
+				self._evict()
+			self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+
+	def __setitem__(self, key, value):
+		self.set(key, value)
+
+	def __contains__(self, key):
+		return self.get(key) is not None
+
+	def clear(self):
+		with self._lock:
+			self._data.clear()
+
+	def _evict(self):
+		# Caller holds self._lock
+		now = time.monotonic()
+		for key in [k for k, (t, _) in self._data.items() if t <= now]:
+			del self._data[key]
+		while len(self._data) >= self.maxsize:
+			del self._data[next(iter(self._data))]
+
+class TokenBucket:
+	"""Thread-safe token bucket for proactive client-side rate limiting.
+
+	Requests self-pace to the configured quota instead of overshooting
+	and then stalling on the server's 60s+ 503 penalty. penalty() drains
+	the bucket and blocks refills for a server-dictated window (e.g. a
+	Retry-After header), pausing all workers together."""
+
+	def __init__(self, rate, capacity):
+		self.rate = float(rate)        # tokens refilled per second
+		self.capacity = float(capacity)  # burst size
+		self._tokens = float(capacity)
+		self._updated = time.monotonic()
+		self._blocked_until = 0.0
+		self._lock = threading.Lock()
+
+	def acquire(self, tokens=1):
+		"""Block until the requested tokens are available, then take them."""
+		while True:
+			with self._lock:
+				now = time.monotonic()
+				if now >= self._blocked_until:
+					self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+					self._updated = now
+					if self._tokens >= tokens:
+						self._tokens -= tokens
+						return
+					wait = (tokens - self._tokens) / self.rate
+				else:
+					wait = self._blocked_until - now
+			time.sleep(wait)
+
+	def penalty(self, seconds):
+		"""Drain the bucket and hold all acquirers for the given window."""
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = 0.0
+			self._updated = now
+			self._blocked_until = max(self._blocked_until, now + seconds)
+
+# Combined lookup used by the query coalescer: many titles in, (title, uid) rows out
+_Q_PAGE_UIDS_BULK = '[:find ?title ?uid :in $ [?title ...] :where [?e :node/title ?title] [?e :block/uid ?uid]]'
+
+# Parameterized query shapes, hoisted so the server sees one stable query
+# text per shape (letting it reuse a compiled plan) and so titles and
+# strings travel as :in bindings rather than interpolated literals
+_Q_SEARCH_PAGES = '[:find [?title ...] :in $ ?search :where [?e :node/title ?title] [(clojure.string/includes? ?title ?search)]]'
+_Q_ALL_TITLES = '[:find [?title ...] :where [?e :node/title ?title]]'
+_Q_PAGES_WITH_CHILDREN = '''[
+	:find (pull ?e [:node/title {:block/children [:block/string]}])
+	:in $ [?title ...]
+	:where [?e :node/title ?title]
+]'''
+_Q_PAGE_REFS = '[:find [?ref_title ...] :in $ ?title :where [?e :node/title ?title] [?ref :block/refs ?e] [?ref_page :block/children ?ref] [?ref_page :node/title ?ref_title]]'
+_Q_PAGE_CONTENT = '''[
+	:find (pull ?e [:node/title {:block/children [:block/string :block/uid {:block/children ...}]}])
+	:in $ ?uid
+	:where [?e :block/uid ?uid]
+]'''
+_Q_BLOCK_UIDS = '[:find [?uid ...] :in $ ?title :where [?e :node/title ?title] [?e :block/children ?c] [?c :block/uid ?uid]]'
+_Q_BLOCK_CONTENT = '[:find ?string . :in $ ?uid :where [?b :block/uid ?uid] [?b :block/string ?string]]'
+_Q_BLOCK_CONTENTS_BULK = '[:find ?uid ?s :in $ [?uid ...] :where [?b :block/uid ?uid] [?b :block/string ?s]]'
+# String clause first: binding ?b through the indexed :block/string AVET
+# lookup narrows candidates to blocks with that exact text (usually 0-1)
+# before the page filter, instead of scanning every block on the page
+_Q_PARENT_BLOCK = '[:find ?uid . :in $ ?page_uid ?string :where [?b :block/string ?string] [?b :block/page ?p] [?p :block/uid ?page_uid] [?b :block/uid ?uid]]'
+# Title-joined variant for speculative probes: joining on :node/title
+# removes the data dependency on the page UID, so the parent probe can
+# overlap the page-resolution round-trip
+_Q_PARENT_BLOCK_BY_TITLE = '[:find ?uid . :in $ ?title ?string :where [?b :block/string ?string] [?b :block/page ?p] [?p :node/title ?title] [?b :block/uid ?uid]]'
+_Q_GRAPH_STRUCTURE = '[:find (pull ?e [:node/title {:block/children [:block/string]}]) :where [?e :node/title]]'
+_Q_LAST_CHILD = '''
+	[:find ?uid .
+	 :in $ ?parent_uid
+	 :where
+	 [?p :block/uid ?parent_uid]
+	 [?p :block/children ?c]
+	 [?c :block/uid ?uid]
+	 (not-join [?c]
+	   [?p :block/children ?c2]
+	   [?c2 :create/time ?t2]
+	   [?c :create/time ?t]
+	   [(> ?t2 ?t)])]
+'''
+
+class QueryCoalescer:
+	"""Coalesce many small lookups into one combined Datalog query.
+
+	Callers submit a key (e.g. a page title) and block on the returned
+	Future. When nothing is in flight the lookup runs immediately — a
+	sole synchronous caller must not pay a debounce window on top of the
+	round-trip. Keys submitted while a batch is in flight accumulate and
+	are flushed as one collection-bound query once max_batch keys pile up
+	or the oldest entry is max_wait seconds old, so N concurrent lookups
+	cost one round-trip instead of N."""
+
+	def __init__(self, client, query, max_batch=32, max_wait=0.05):
+		self._client = client
+		self._query = query  # must :find ?key ?value and bind :in $ [?key ...]
+		self._max_batch = max_batch
+		self._max_wait = max_wait
+		self._lock = threading.Lock()
+		self._pending = {}  # key -> list of Futures awaiting it
+		self._timer = None
+		self._inflight = 0  # batches currently querying
+
+	def submit(self, key):
+		"""Queue a lookup for key; returns a Future resolving to its value (or None)."""
+		future = Future()
+		with self._lock:
+			self._pending.setdefault(key, []).append(future)
+			if self._inflight == 0 or len(self._pending) >= self._max_batch:
+				batch = self._drain_locked()
+				self._inflight += 1
+			else:
+				batch = None
+				if self._timer is None:
+					self._timer = threading.Timer(self._max_wait, self._flush)
+					self._timer.daemon = True
+					self._timer.start()
+		if batch:
+			self._run(batch)
+		return future
+
+	def _drain_locked(self):
+		batch, self._pending = self._pending, {}
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+		return batch
+
+	def _flush(self):
+		with self._lock:
+			batch = self._drain_locked()
+			if batch:
+				self._inflight += 1
+		if batch:
+			self._run(batch)
+
+	def _run(self, batch):
+		try:
+			try:
+				rows = q(self._client, self._query, [list(batch)]) or []
+				found = dict(rows)
+			except Exception as e:
+				for futures in batch.values():
+					for future in futures:
+						future.set_exception(e)
+				return
+			for key, futures in batch.items():
+				value = found.get(key)
+				for future in futures:
+					future.set_result(value)
+		finally:
+			# Keys that arrived during the flight armed a timer in
+			# submit(), so they flush without further bookkeeping here
+			with self._lock:
+				self._inflight -= 1
 
 # Set up logging at the beginning of your script
 logging.basicConfig(
 	level=logging.ERROR,
 	format='%(asctime)s - %(levelname)s - %(message)s - [%(filename)s:%(lineno)d]')
 
+# The one public entry point of this module; everything else is a
+# module-private helper subject to change
+__all__ = ['RoamAPI']
+
 class RoamAPI:
-	def __init__(self, graph, token):
-		self.client = initialize_graph({"graph": graph, "token": token})
+	def __init__(self, graph, token, rate_limit=50 / 60.0, burst=10):
+		self.client = get_client(graph, token)
+		# kept for async_api(); the backend client keeps its copy private
+		self._graph = graph
+		self._token = token
 		self.__uid_cache = {}
+		# page title -> uid (or _NEG for known-missing titles, which
+		# expire faster so a page created elsewhere shows up promptly)
+		self._page_uid_cache = _TTLCache(4096, ttl=300)
+		# (method, key) -> result for idempotent read queries; cleared
+		# wholesale whenever this client performs a write
+		self._read_cache = _TTLCache(16384, ttl=60)
+		# concurrent title lookups share one combined query per window
+		self._page_uid_coalescer = QueryCoalescer(self.client, _Q_PAGE_UIDS_BULK)
+		# proactive pacing to Roam's quota (defaults: ~50 req/min, burst
+		# of 10; tune per graph via the constructor). Invariant: the
+		# bucket (plus reactive backoff on 503) is the only thing that
+		# paces requests — no write path may add fixed sleeps
+		self._bucket = TokenBucket(rate=rate_limit, capacity=burst)
+		# shared pool for sibling-level write fan-out, built on first use;
+		# the bucket keeps the workers inside the server quota
+		self._io_pool = None
 		self.__last_request_time = 0
-		self.__min_request_interval = 0.1  # 100ms between requests
 
 	def get_roam_date_format(self, date):
 		"""Convert a date to the format Roam uses for daily pages."""
 		if isinstance(date, str):
 			# If it's already a string, assume it's in the correct format and return it
 			return date
-
-		suffixes = {1: 'st', 2: 'nd', 3: 'rd'}
-		day = date.day
-		suffix = suffixes.get(day % 10, 'th') if day not in [11, 12, 13] else 'th'
-		return date.strftime(f"%B {day}{suffix}, %Y")
+		return _roam_date_string(date.year, date.month, date.day)
 
 	def process_block_text(self, block_text):
-		# Replace literal '\n' with actual newline characters
-		block_text = block_text.replace('\\n', '\n')
+		"""Expand literal \\n escapes and map [] / [x] markers to Roam TODO/DONE.
 
-		lines = block_text.split('\n')
-		processed_lines = []
-
-		# Replaces TODO/DONE codes
-		for line in lines:
-			if line.strip().startswith("[]"):
-				processed_lines.append(line.replace("[]", "{{[[TODO]]}}"))
-			elif line.strip().startswith("[x]"):
-				processed_lines.append(line.replace("[x]", "{{[[DONE]]}}"))
+		A single multiline re.sub replaces the old split/loop/join, so large
+		block texts are processed in one pass with one output allocation."""
+		block_text = block_text.replace('\\n', '\n')
+		# Fast path: str.__contains__ is a single memmem-backed scan, so
+		# texts without any bracket (the common case) skip the regex pass
+		# and return the original object with no copy
+		if '[' not in block_text:
+			return block_text
+		return _RE_TODO.sub(
+			lambda m: m.group(1) + ('{{[[DONE]]}}' if m.group(2) else '{{[[TODO]]}}'),
+			block_text)
+
+	def _scan_markdown_line(self, line, levels, top):
+		"""Classify one markdown line and attach it to the level-indexed stack.
+
+		Direct character scans (hash counting for headings, digit+dot for
+		numbered items) instead of regexes and per-line split/strip
+		round-trips. levels[k] holds the children list open at nesting level
+		k-1 (levels[0] is the root), so finding a parent and shadowing
+		deeper levels are index operations rather than repeated list pops.
+		Returns the new top index; shared by parse_markdown and
+		parse_markdown_stream."""
+		# Scan indent and trailing-whitespace bounds in place
+		n = len(line)
+		i = 0
+		while i < n and line[i] in ' \t':
+			i += 1
+		end = n
+		while end > i and line[end - 1] in ' \t\r\n':
+			end -= 1
+		if i == end:
+			return top
+		c = line[i]
+
+		if c == '#' and i == 0:
+			# Headings: count hashes, title is the rest of the line
+			level = 1
+			while level < end and line[level] == '#':
+				level += 1
+			h = level
+			while h < end and line[h] in ' \t':
+				h += 1
+			new_block = {'content': line[h:end], 'properties': {'heading': level}, 'children': []}
+			container = True
+		elif c == '-' and i == 0 and n > 1 and line[1] == ' ':
+			# Bullet points
+			level = i
+			b = 2
+			while b < end and line[b] in ' \t':
+				b += 1
+			new_block = {'content': line[b:end], 'properties': {'bullet': True}, 'children': []}
+			container = True
+		else:
+			# Numbered lists: digits then a dot, all scanned directly
+			level = i
+			j = i
+			while j < end and '0' <= line[j] <= '9':
+				j += 1
+			if j > i and j < end and line[j] == '.':
+				j += 1
+				while j < end and line[j] in ' \t':
+					j += 1
+				new_block = {'content': line[j:end], 'properties': {'numbered': True}, 'children': []}
+				container = True
 			else:
-				processed_lines.append(line)
-
-		return '\n'.join(processed_lines)
+				# Regular content: attaches but opens no nesting level
+				new_block = {'content': line[i:end], 'children': []}
+				container = False
+
+		idx = level + 1
+		if idx >= len(levels):
+			levels.extend([None] * (idx + 1 - len(levels)))
+		if top >= idx:
+			# Shadow everything at this level and deeper
+			for k in range(idx, top + 1):
+				levels[k] = None
+			top = idx - 1
+		for k in range(idx - 1, -1, -1):
+			if levels[k] is not None:
+				levels[k].append(new_block)
+				break
+		if container:
+			levels[idx] = new_block['children']
+			top = idx
+		return top
 
 	def parse_markdown(self, content):
-		content = '\n'.join(line for line in content.splitlines() if line.strip())
-		lines = content.split('\n')
-		blocks = []
-		stack = [{'level': 0, 'children': blocks}]
-
-		for line in lines:
-
-			stripped = line.strip()
-			if not stripped:
-				continue
+		"""Parse markdown into the nested block structure _add_blocks consumes.
 
-			indent = len(line) - len(line.lstrip())
-
-			if line.startswith('#'):
-				# Handle headings
-				level = len(line.split()[0])
-				new_block = {'content': stripped[level:].strip(), 'properties': {'heading': level}, 'children': []}
-				while stack[-1]['level'] >= level:
-					stack.pop()
-				stack[-1]['children'].append(new_block)
-				stack.append({'level': level, 'children': new_block['children']})
-			elif line.startswith('- '):
-				# Handle bullet points
-				content = stripped[2:].strip()
-				new_block = {'content': content, 'properties': {'bullet': True}, 'children': []}
-				while stack[-1]['level'] >= indent:
-					stack.pop()
-				stack[-1]['children'].append(new_block)
-				stack.append({'level': indent, 'children': new_block['children']})
-			elif re.match(r'^\d+\.', stripped):
-				# Handle numbered lists
-				content = re.sub(r'^\d+\.\s*', '', stripped)
-				new_block = {'content': content, 'properties': {'numbered': True}, 'children': []}
-				while stack[-1]['level'] >= indent:
-					stack.pop()
-				stack[-1]['children'].append(new_block)
-				stack.append({'level': indent, 'children': new_block['children']})
+		Single manual pass over the string: lines are sliced out with find()
+		and fed through _scan_markdown_line, keeping the inner loop
+		allocation-light on large imports."""
+		blocks = []
+		# level-indexed stack: levels[0] is the root children list
+		levels = [blocks] + [None] * 16
+		top = 0
+
+		pos = 0
+		length = len(content)
+		while pos < length:
+			nl = content.find('\n', pos)
+			if nl == -1:
+				line, pos = content[pos:], length
 			else:
-				# Regular content
-				new_block = {'content': stripped, 'children': []}
-				while stack[-1]['level'] >= indent:
-					stack.pop()
-				stack[-1]['children'].append(new_block)
+				line, pos = content[pos:nl], nl + 1
+			top = self._scan_markdown_line(line, levels, top)
 
 		return blocks
 
+	def parse_markdown_stream(self, lines):
+		"""Yield top-level blocks from an iterable of lines as they close.
+
+		A top-level block is complete once a new block attaches at the root,
+		so callers can start uploading while the rest of the file is still
+		being read; peak memory is one top-level subtree, not the file."""
+		blocks = []
+		levels = [blocks] + [None] * 16
+		top = 0
+		for line in lines:
+			top = self._scan_markdown_line(line, levels, top)
+			while len(blocks) > 1:
+				yield blocks.pop(0)
+		yield from blocks
 
 	# Page-Related Definitions ----------------------------------------
 
 	def create_page(self, title):
-		"""Create a new page with the given title."""
+		"""Create a new page with the given title and return its UID.
+
+		The UID is generated client-side and sent with the create request,
+		so callers never need a follow-up get_page_uid query to learn it."""
+		new_uid = _gen_uid()
 		try:
-			create_block(self.client, {
-				"location": {"page-title": title, "order": 0},
-				"block": {"string": "[[Log/DevonThink]]"}
-			})
-			return title
+			backend_create_page(self.client, {"page": {"title": title, "uid": new_uid}})
+			# Seed both lookup caches so the title resolves without a query
+			self._page_uid_cache[title] = new_uid
+			self.__uid_cache[title] = new_uid
+			return new_uid
 		except Exception as e:
 			print(f"Error creating page: {str(e)}")
 			return None
@@ -131,7 +502,7 @@ class RoamAPI:
 			today = datetime.datetime.now()
 			page_title = self.get_roam_date_format(today)
 			uid = self.get_or_create_daily_note(page_title)
-		elif re.match(r'^\d{4}-\d{2}-\d{2}$', page):
+		elif _is_iso_date(page):
 			# It's a date in YYYY-MM-DD format
 			try:
 				date_obj = datetime.datetime.strptime(page, "%Y-%m-%d")
@@ -140,16 +511,13 @@ class RoamAPI:
 			except ValueError:
 				print("Error: Invalid date format. Please use YYYY-MM-DD.")
 				return None
-		elif re.match(r'^[a-zA-Z0-9]{9}$', page):
+		elif _is_uid9(page):
 			# It looks like a UID
 			uid = page
 		else:
-			# Treat it as a regular page title
-			uid = self.get_page_uid(page)
-			if not uid:
-				# If page doesn't exist, create it
-				self.create_page(page)
-				uid = self.get_page_uid(page)
+			# Treat it as a regular page title; create_page returns the
+			# client-generated UID, so a miss needs no follow-up lookup
+			uid = self.get_page_uid(page) or self.create_page(page)
 
 		if uid:
 			self.__uid_cache[page] = uid
@@ -161,91 +529,188 @@ class RoamAPI:
 			date = datetime.datetime.now()
 		date_string = self.get_roam_date_format(date)
 
-		# Check if the page already exists
-		page_uid = self.get_page_uid(date_string)
-
-		if not page_uid:
-			# If the page doesn't exist, create it
-			self.create_page(date_string)
-			page_uid = self.get_page_uid(date_string)
+		cached = self._page_uid_cache.get(date_string)
+		if cached and cached is not _NEG:
+			return cached
 
-		return page_uid
+		# create_page returns the (client-generated) UID directly, so a
+		# miss costs one write with no follow-up lookup
+		uid = self.get_page_uid(date_string) or self.create_page(date_string)
+		if uid:
+			# A daily page's title->UID mapping can't change once created,
+			# so pin it until local midnight rather than letting the
+			# general 5-minute page TTL force hot loops to re-resolve it
+			now = datetime.datetime.now()
+			midnight = datetime.datetime.combine(
+				now.date() + datetime.timedelta(days=1), datetime.time.min)
+			self._page_uid_cache.set(date_string, uid, ttl=(midnight - now).total_seconds())
+		return uid
 
 	def search_pages(self, search_string):
 		"""Search for pages containing the given string."""
-		query = f'[:find [?title ...] :where [?e :node/title ?title] [(clojure.string/includes? ?title "{search_string}")]]'
-		return q(self.client, query)
+		cached = self._read_cache.get(('search_pages', search_string))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_SEARCH_PAGES, [search_string])
+		if result:
+			self._read_cache.set(('search_pages', search_string), result, ttl=30)
+		return result
+
+	def iter_search_pages(self, search_string, page_size=500):
+		"""Yield matching page titles lazily.
+
+		Roam's query API has no server-side offset/limit, so the title
+		list still arrives in one response, but yielding lets callers
+		start consuming immediately and avoids building intermediate
+		lists when they stop early."""
+		for title in self.search_pages(search_string) or []:
+			yield title
+
+	def iter_graph_structure(self, chunk_size=500):
+		"""Yield (title, children) per page without materializing the whole graph.
+
+		get_graph_structure pulls every page and its immediate children in
+		one response, which is heavy on large graphs. This instead fetches
+		the (cheap) title list once, then pulls children in chunks, so
+		peak memory is bounded by chunk_size and the first results arrive
+		after one small round-trip."""
+		titles = q(self.client, _Q_ALL_TITLES) or []
+		for start in range(0, len(titles), chunk_size):
+			chunk = titles[start:start + chunk_size]
+			for row in q(self.client, _Q_PAGES_WITH_CHILDREN, [chunk]) or []:
+				yield row[0]
 
 	def get_page_references(self, page_title):
 		"""Get all pages that reference the given page."""
-		query = f'[:find [?ref_title ...] :where [?e :node/title "{page_title}"] [?ref :block/refs ?e] [?ref_page :block/children ?ref] [?ref_page :node/title ?ref_title]]'
-		return q(self.client, query)
+		cached = self._read_cache.get(('page_refs', page_title))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_PAGE_REFS, [page_title])
+		if result:
+			self._read_cache.set(('page_refs', page_title), result, ttl=30)
+		return result
+
+	def _invalidate_reads(self):
+		"""Drop cached read-query results after any mutation."""
+		self._read_cache.clear()
+
+	def clear_cache(self):
+		"""Drop all memoized lookups (page UIDs and read queries).
+
+		Long-lived clients sharing a graph with other writers can call
+		this to force fresh lookups; normal single-command usage never
+		needs it."""
+		self._page_uid_cache.clear()
+		self._read_cache.clear()
+		self.__uid_cache.clear()
 
 	def get_page_content(self, page_uid):
-		query = f'''[
-			:find (pull ?e [:node/title {{:block/children [:block/string :block/uid {{:block/children ...}}]}}])
-			:where [?e :block/uid "{page_uid}"]
-		]'''
-		result = q(self.client, query)
-		return result[0][0] if result else None
+		cached = self._read_cache.get(('page_content', page_uid))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_PAGE_CONTENT, [page_uid])
+		content = result[0][0] if result else None
+		if content is not None:
+			self._read_cache[('page_content', page_uid)] = content
+		return content
 
 	def get_page_uid(self, page_title):
-		"""Get the UID of a page by its title."""
-		query = f'[:find ?uid . :where [?e :node/title "{page_title}"] [?e :block/uid ?uid]]'
-		return q(self.client, query)
+		"""Get the UID of a page by its title (memoized per client)."""
+		cached = self._page_uid_cache.get(page_title)
+		if cached is _NEG:
+			return None
+		if cached:
+			return cached
+		uid = self._page_uid_coalescer.submit(page_title).result()
+		if uid:
+			self._page_uid_cache[page_title] = uid
+		else:
+			self._page_uid_cache.set(page_title, _NEG, ttl=30)
+		return uid
 
 	# Block-related Definitions --------------------------------------
 
 	def _add_blocks(self, parent_uid, blocks):
-		last_heading_uid = None
-		for block in blocks:
-			content = block.pop('content')
-			properties = block.copy()
+		# Flatten the tree into batch-actions payloads: UIDs are assigned
+		# client-side so parent->child references resolve inside a single
+		# POST, and N blocks cost one round-trip (chunked at 50) instead
+		# of one each. Frames are [parent_uid, sibling iterator, last
+		# heading uid], preserving the numbered-list-under-heading
+		# reparenting of the per-block path.
+		actions = []
+		stack = [[parent_uid, iter(blocks), None]]
+		while stack:
+			frame = stack[-1]
+			try:
+				block = next(frame[1])
+			except StopIteration:
+				stack.pop()
+				continue
 
-			# Check if this is a numbered list item following a heading
-			if last_heading_uid and re.match(r'^\d+\.', content):
-				parent_uid = last_heading_uid  # Indent under the last heading
+			# Read-only view of the caller's dict: no pop/copy, so the
+			# parsed tree survives the walk and nothing allocates per block
+			content = block['content']
+			properties = {k: v for k, v in block.items() if k not in ('content', 'children')}
 
-			new_block_uid = self.add_block_with_retry(parent_uid, content, **properties)
+			# Check if this is a numbered list item following a heading
+			if frame[2] and _RE_NUMBERED.match(content):
+				frame[0] = frame[2]  # Indent under the last heading
+
+			new_uid = _gen_uid()
+			block_body = {"uid": new_uid, "string": content}
+			block_body.update(properties)
+			actions.append({
+				"action": "create-block",
+				"location": {"parent-uid": frame[0], "order": "last"},
+				"block": block_body
+			})
 
-			if new_block_uid:
-				if 'heading' in properties:
-					last_heading_uid = new_block_uid
-				if 'children' in block:
-					self._add_blocks(new_block_uid, block['children'])
+			if 'heading' in properties:
+				frame[2] = new_uid
+			if block.get('children'):
+				stack.append([new_uid, iter(block['children']), None])
 
-			time.sleep(0.5)  # Add a 0.5 second delay between adding blocks
+		for start in range(0, len(actions), 50):
+			self._make_api_call(self.client.batch_actions, actions[start:start + 50])
+		self._invalidate_reads()
 
 	def add_block_with_retry(self, parent_uid, content, **properties):
 		max_retries = 10  # Increased to allow for more retries
-		initial_delay = 30  # Wait 30 seconds after first rate limit hit
-		retry_interval = 5  # Try every 5 seconds thereafter
+		# UID is generated client-side, so success needs no follow-up
+		# get_last_block_uid query to learn it
+		new_uid = _gen_uid()
 
 		for attempt in range(max_retries):
+			self._bucket.acquire()
 			try:
 				block_data = {
 					"location": {"parent-uid": parent_uid, "order": "last"},
-					"block": {"string": content}
+					"block": {"uid": new_uid, "string": content}
 				}
 				if properties:
 					block_data["block"].update(properties)
 
 				status_code = create_block(self.client, block_data)
 				if status_code == 200:
-					return self.get_last_block_uid(parent_uid)
+					self._invalidate_reads()
+					return new_uid
 				else:
 					print(f"Unexpected status code {status_code} on attempt {attempt + 1}")
-			except Exception as e:
-				if "Error (HTTP 503)" in str(e):
-					if attempt == 0:
-						print(f"Rate limit hit. Waiting for {initial_delay} seconds before retrying...")
-						time.sleep(initial_delay)
+			except RoamHTTPError as e:
+				if e.status in (429, 503):
+					print(f"Rate limit hit (attempt {attempt + 1}). Backing off...")
+					# A server-supplied Retry-After window beats guessing
+					self._bucket.penalty(e.retry_after or 5)
+					if e.retry_after:
+						time.sleep(e.retry_after)
 					else:
-						print(f"Rate limit still in effect. Retrying in {retry_interval} seconds...")
-						time.sleep(retry_interval)
+						_sleep_backoff(attempt)
 				else:
 					print(f"Error adding block: {str(e)}")
 					return None
+			except Exception as e:
+				print(f"Error adding block: {str(e)}")
+				return None
 
 		print("Max retries reached. Failed to add block.")
 		return None
@@ -255,183 +720,369 @@ class RoamAPI:
 			print("Error: Block text cannot be empty.")
 			return
 
-		# Process the block text
-		self.process_block_text = self.process_block_text(block_text)
-		block_lines = self.process_block_text.split('\n')
-
-		# Get or create the page UID
-		page_uid = self.get_or_create_page_uid(page)
-		if not page_uid:
-			print(f"Error: Could not find or create page: {page}")
+		# Process the block text. Whitespace-only lines would each cost a
+		# batch action and leave an empty block behind, and consecutive
+		# duplicates are almost always paste artifacts, so both are
+		# dropped before anything goes on the wire.
+		block_lines = []
+		for line in self.process_block_text(block_text).split('\n'):
+			line = line.rstrip()
+			if line and (not block_lines or line != block_lines[-1]):
+				block_lines.append(line)
+		if not block_lines:
+			print("Error: Block text cannot be empty.")
 			return
 
-		if parent:
-			# Find or create the parent block
-			parent_uid = self.find_or_create_parent_block(page_uid, parent)
-			if parent_uid is None:
-				print(f"Error: Could not find or create parent block: {parent}")
-				return
-			# Add the new blocks as children of the parent block
-			success = True
-			for line in block_lines:
-				success = success and self.add_block_with_retry(parent_uid, line, order=order)
+		if page is None and parent is None:
+			# Hot path: daily-note appends need no page lookup at all;
+			# a page-title location lets Roam upsert today's page server-side
+			location = {'page-title': self.get_roam_date_format(datetime.datetime.now())}
 		else:
-			# Add the new blocks to the page
-			success = True
-			for line in block_lines:
-				success = success and self.add_block_with_retry(page_uid, line, order=order)
+			parent_probe = None
+			if parent and page and page not in self.__uid_cache and not _is_uid9(page):
+				# Both probes are read-only, and the title-joined parent
+				# query carries no data dependency on the page UID, so the
+				# probe overlaps the page resolution on the shared pool:
+				# a cold path pays max(rtt) instead of the sum. Misses
+				# simply fall back to the find-or-create sequence below.
+				probe_title = page
+				if _is_iso_date(page):
+					try:
+						probe_title = self.get_roam_date_format(
+							datetime.datetime.strptime(page, "%Y-%m-%d"))
+					except ValueError:
+						pass
+				if self._io_pool is None:
+					self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='roam-io')
+				parent_probe = self._io_pool.submit(
+					q, self.client, _Q_PARENT_BLOCK_BY_TITLE, [probe_title, parent])
+
+			# Get or create the page UID
+			page_uid = self.get_or_create_page_uid(page)
+			if not page_uid:
+				print(f"Error: Could not find or create page: {page}")
+				return
 
-		if success:
+			if parent:
+				parent_uid = None
+				if parent_probe is not None:
+					try:
+						parent_uid = parent_probe.result()
+					except Exception:
+						parent_uid = None  # speculative; the sequential path recovers
+					if parent_uid:
+						self._read_cache[('parent_block', page_uid, parent)] = parent_uid
+				if parent_uid is None:
+					# Find or create the parent block
+					parent_uid = self.find_or_create_parent_block(page_uid, parent)
+				if parent_uid is None:
+					print(f"Error: Could not find or create parent block: {parent}")
+					return
+				location = {'parent-uid': parent_uid}
+			else:
+				location = {'parent-uid': page_uid}
+
+		# One batch-actions POST replaces the old per-line create-block
+		# loop, so an N-line paste costs one round-trip instead of N.
+		# Actions execute in order server-side, which reproduces the
+		# sequential loop's semantics exactly (including 'first'
+		# inserting lines in reverse order, as before).
+		actions = []
+		for line in block_lines:
+			actions.append({
+				'action': 'create-block',
+				'location': dict(location, order=order),
+				'block': {'uid': _gen_uid(), 'string': line}
+			})
+		if self._make_api_call(self.client.batch_actions, actions) == 200:
+			self._invalidate_reads()
 			print(f"Successfully added new block(s) to the page")
 		else:
 			print(f"Failed to add block(s) to the page")
 
 	def get_last_block_uid(self, parent_uid):
-		max_retries = 10
-		initial_delay = 30
-		retry_interval = 5
+		"""Find the most recently created child of parent_uid.
+
+		.. deprecated:: the write paths generate block UIDs client-side
+		   and return them directly, so nothing in this module calls this
+		   anymore. It remains for external callers; each use costs a
+		   round-trip plus an O(siblings) not-join on the server, and the
+		   "latest child" heuristic is racy under concurrent writers."""
+		warnings.warn(
+			"get_last_block_uid is deprecated; use the UID returned by the write methods",
+			DeprecationWarning, stacklevel=2)
+		max_retries = 5
 
 		for attempt in range(max_retries):
 			try:
-				query = f"""
-					[:find ?uid .
-					 :where
-					 [?p :block/uid "{parent_uid}"]
-					 [?p :block/children ?c]
-					 [?c :block/uid ?uid]
-					 (not-join [?c]
-					   [?p :block/children ?c2]
-					   [?c2 :create/time ?t2]
-					   [?c :create/time ?t]
-					   [(> ?t2 ?t)])]
-				"""
-				result = q(self.client, query)
+				result = q(self.client, _Q_LAST_CHILD, [parent_uid])
 				if result:
 					return result
-				else:
-					print(f"No result found on attempt {attempt + 1}")
-					time.sleep(retry_interval)  # Wait before retrying if no result
-			except Exception as e:
-				if "Error (HTTP 503)" in str(e):
-					if attempt == 0:
-						print(f"Rate limit hit. Waiting for {initial_delay} seconds before retrying...")
-						time.sleep(initial_delay)
+				if attempt == 0:
+					# One short grace retry covers read-after-write lag; a
+					# still-empty result means a bad parent_uid, not a
+					# transient condition, so fail fast instead of sleeping
+					time.sleep(0.5)
+					continue
+				print("No children found for parent; giving up.")
+				return None
+			except RoamHTTPError as e:
+				if e.status in (429, 503):
+					print(f"Rate limit hit (attempt {attempt + 1}). Backing off...")
+					self._bucket.penalty(e.retry_after or 5)
+					if e.retry_after:
+						time.sleep(e.retry_after)
 					else:
-						print(f"Rate limit still in effect. Retrying in {retry_interval} seconds...")
-						time.sleep(retry_interval)
+						_sleep_backoff(attempt)
 				else:
 					print(f"Error getting last block UID: {str(e)}")
-					time.sleep(retry_interval)  # Wait before retrying on other errors
+					return None
+			except Exception as e:
+				print(f"Error getting last block UID: {str(e)}")
+				return None
 
 		print("Max retries reached. Failed to get last block UID.")
 		return None
 
-	def create_block_with_children(self, parent_uid, block):
+	def _create_single_block(self, parent_uid, block, order):
+		"""Create one block with a client-generated UID; returns the UID."""
 		content = block.get('content', '')
-		logging.debug(f"Creating block: {content[:50]}...")
-		if content.strip():
-			block_data = {
-				"location": {"parent-uid": parent_uid, "order": "last"},
-				"block": {"string": content.strip()}
-			}
-			result = self._make_api_call(create_block, self.client, block_data)
-			if result is None:
-				logging.error(f"Failed to create block: {content[:50]}...")
-				return None
-
-			new_block_uid = self.get_last_block_uid(parent_uid)
-			if new_block_uid:
-				for child in block.get('children', []):
-					self.create_block_with_children(new_block_uid, child)
-			return new_block_uid
-		else:
-			logging.warning(f"Skipping empty block")
+		logging.debug("Creating block: %.50s...", content)
+		if not content.strip():
+			logging.warning("Skipping empty block")
+			return None
+		new_block_uid = _gen_uid()
+		block_data = {
+			"location": {"parent-uid": parent_uid, "order": order},
+			"block": {"uid": new_block_uid, "string": content.strip()}
+		}
+		result = self._make_api_call(create_block, self.client, block_data)
+		self._invalidate_reads()
+		if result is None:
+			logging.error(f"Failed to create block: {content[:50]}...")
+			return None
+		return new_block_uid
+
+	def create_block_with_children(self, parent_uid, block, executor=None, order='last'):
+		"""Create a block and its subtree, one level at a time.
+
+		Siblings within a level are independent (each carries an explicit
+		integer order and a pre-generated UID), so they are created
+		concurrently — on a small shared pool by default, or on a
+		caller-supplied executor. Levels are processed from the caller's
+		thread, which avoids submitting work from inside the pool, and
+		the token bucket keeps the workers inside the server quota."""
+		if executor is None:
+			if self._io_pool is None:
+				self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='roam-io')
+			executor = self._io_pool
+
+		root_uid = self._create_single_block(parent_uid, block, order)
+		if root_uid is None:
 			return None
 
-	def batch_create_blocks(self, parent_uid, blocks):
-		logging.info(f"Starting batch_create_blocks with {len(blocks)} blocks")
-		for i, block in enumerate(blocks, 1):
-			logging.info(f"Processing block {i}/{len(blocks)}")
-			result = self.create_block_with_children(parent_uid, block)
-			if result is None:
-				logging.warning(f"Failed to create block {i}, retrying...")
-				retry_count = 0
-				while result is None and retry_count < 3:
-					retry_count += 1
-					time.sleep(random.uniform(1, 3))  # Random delay between 1-3 seconds
-					result = self.create_block_with_children(parent_uid, block)
-				if result is None:
-					logging.error(f"Failed to create block {i} after 3 retries")
-			time.sleep(0.5)  # Reduced delay between blocks
-		logging.info("Finished batch_create_blocks")
+		level = [(root_uid, i, child) for i, child in enumerate(block.get('children', []))]
+		while level:
+			uids = list(executor.map(
+				lambda item: self._create_single_block(item[0], item[2], item[1]), level))
+			next_level = []
+			for (puid, i, child), uid in zip(level, uids):
+				if uid:
+					next_level.extend(
+						(uid, j, grandchild) for j, grandchild in enumerate(child.get('children', [])))
+			level = next_level
+		return root_uid
+
+	def batch_create_blocks(self, parent_uid, blocks, chunk_size=50):
+		"""Create a whole block tree with chunked batch-actions requests.
+
+		Accepts any iterable of top-level blocks — including the
+		parse_markdown_stream generator — and flushes a batch whenever
+		chunk_size actions have accumulated, so uploading overlaps
+		parsing instead of waiting for the whole tree. An N-block import
+		costs ceil(N/chunk_size) round-trips with no uid lookups;
+		create_block_with_children remains as the per-block fallback for
+		callers that need individual writes."""
+		buffer = []
+		sent = 0
+		for i, block in enumerate(blocks):
+			buffer.extend(self._flatten_with_uids([block], parent_uid, first_order=i))
+			while len(buffer) >= chunk_size:
+				chunk, buffer = buffer[:chunk_size], buffer[chunk_size:]
+				status_code = self._make_api_call(self.client.batch_actions, chunk)
+				if status_code != 200:
+					logging.error(f"Batch starting at action {sent} failed with status {status_code}")
+					self._invalidate_reads()
+					return False
+				sent += len(chunk)
+		if buffer:
+			status_code = self._make_api_call(self.client.batch_actions, buffer)
+			if status_code != 200:
+				logging.error(f"Batch starting at action {sent} failed with status {status_code}")
+				self._invalidate_reads()
+				return False
+			sent += len(buffer)
+		self._invalidate_reads()
+		logging.info("Finished batch_create_blocks after %s actions", sent)
+		return True
+
+	def _flatten_with_uids(self, blocks, parent_uid, first_order=0):
+		"""Flatten a parsed block tree into a list of create-block actions.
+
+		Assigns each block a client-generated UID up front so children can
+		reference their parent without any follow-up query, and the whole
+		tree can be sent in a single batch request. The traversal uses an
+		explicit stack, so arbitrarily deep trees cannot hit Python's
+		recursion limit."""
+		actions = []
+		stack = [(parent_uid, i, block) for i, block in reversed(list(enumerate(blocks, first_order)))]
+		while stack:
+			puid, order, block = stack.pop()
+			uid = _gen_uid()
+			actions.append({
+				'action': 'create-block',
+				'location': {'parent-uid': puid, 'order': order},
+				'block': {'uid': uid, 'string': block['content']}
+			})
+			children = block.get('children') or []
+			for i, child in reversed(list(enumerate(children))):
+				stack.append((uid, i, child))
+		return actions
+
+	def add_nested_blocks(self, parent_uid, blocks):
+		"""Create an entire nested block tree under parent_uid in one HTTP call.
+
+		Instead of one create_block round-trip per node (plus a
+		get_last_block_uid query to discover each new UID), flatten the tree
+		with pre-assigned UIDs and POST everything as a single batch."""
+		actions = self._flatten_with_uids(blocks, parent_uid)
+		if not actions:
+			return True
+		status_code = self._make_api_call(self.client.batch_actions, actions)
+		self._invalidate_reads()
+		if status_code != 200:
+			logging.error(f"Batch block creation failed with status {status_code}")
+			return False
+		return True
 
 	def get_block_uids(self, page_title):
 		"""Get the UIDs of all blocks on a page."""
-		query = f'[:find [?uid ...] :where [?e :node/title "{page_title}"] [?e :block/children ?c] [?c :block/uid ?uid]]'
-		return q(self.client, query)
+		cached = self._read_cache.get(('block_uids', page_title))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_BLOCK_UIDS, [page_title])
+		if result:
+			self._read_cache[('block_uids', page_title)] = result
+		return result
 
 	def get_block_content(self, block_uid):
 		"""Get the content of a block by its UID."""
-		query = f'[:find ?string . :where [?b :block/uid "{block_uid}"] [?b :block/string ?string]]'
-		return q(self.client, query)
+		cached = self._read_cache.get(('block_content', block_uid))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_BLOCK_CONTENT, [block_uid])
+		if result:
+			self._read_cache[('block_content', block_uid)] = result
+		return result
+
+	def get_block_contents(self, block_uids):
+		"""Resolve many block UIDs to their strings in one query.
+
+		Uses a Datalog collection binding so N lookups cost a single
+		round-trip; returns a uid -> string dict."""
+		if not block_uids:
+			return {}
+		result = q(self.client, _Q_BLOCK_CONTENTS_BULK, [list(block_uids)])
+		return dict(result) if result else {}
 
 	def find_or_create_parent_block(self, page_uid, parent_text):
+		# Memoized per (page, text): repeated commands targeting the same
+		# parent block (e.g. a References:: section) skip the lookup. UIDs
+		# are stable, so found-or-created entries never go stale.
+		cache_key = ('parent_block', page_uid, parent_text)
+		cached = self._read_cache.get(cache_key)
+		if cached is not None:
+			return cached
+
 		# Search for the parent block
-		query = f'[:find (pull ?b [:block/uid]) . :where [?b :block/page ?p] [?p :block/uid "{page_uid}"] [?b :block/string "{parent_text}"]]'
-		result = q(self.client, query)
-		logging.debug(f"Query result: {result}")
+		parent_uid = q(self.client, _Q_PARENT_BLOCK, [page_uid, parent_text])
+		logging.debug("Query result: %s", parent_uid)
 
-		if result and ':block/uid' in result:
-			parent_uid = result[':block/uid']
-			logging.debug(f"Found existing parent block with UID: {parent_uid}")
+		if parent_uid:
+			logging.debug("Found existing parent block with UID: %s", parent_uid)
+			self._read_cache[cache_key] = parent_uid
 			return parent_uid
 		else:
-			logging.debug(f"Parent block not found. Creating new parent block.")
-			# If parent block doesn't exist, create it
-			success = self.add_block_with_retry(page_uid, parent_text)
-			if success:
-				# We need to query for the UID of the block we just created
-				new_query = f'[:find (pull ?b [:block/uid]) . :where [?b :block/page ?p] [?p :block/uid "{page_uid}"] [?b :block/string "{parent_text}"]]'
-				new_result = q(self.client, new_query)
-				if new_result and ':block/uid' in new_result:
-					parent_uid = new_result[':block/uid']
-					logging.debug(f"Created new parent block with UID: {parent_uid}")
-					return parent_uid
-				else:
-					logging.error(f"Failed to retrieve UID of newly created parent block")
-					return None
+			logging.debug("Parent block not found. Creating new parent block.")
+			# add_block_with_retry returns the client-generated UID, so no
+			# re-query is needed for the block we just created
+			parent_uid = self.add_block_with_retry(page_uid, parent_text)
+			if parent_uid:
+				logging.debug("Created new parent block with UID: %s", parent_uid)
+				self._read_cache[cache_key] = parent_uid
+				return parent_uid
 			else:
 				logging.error(f"Failed to create new parent block")
 				return None
 
+	def async_api(self):
+		"""Return an AsyncRoamAPI bound to the same graph and token.
+
+		The aiohttp client multiplexes many in-flight requests over a
+		pooled keep-alive session, so latency-bound fan-out (bulk reads,
+		independent sibling writes) overlaps round-trips instead of
+		paying them serially like the blocking client:
+
+			async with roam.async_api() as api:
+				contents = await api.get_blocks_content(uids)
+		"""
+		return AsyncRoamAPI(self._graph, self._token)
+
 	# Other Definitions ---------------------------------------------
 
 	def _make_api_call(self, func, *args, **kwargs):
 		max_retries = 5
-		base_delay = 1
 		for attempt in range(max_retries):
+			self._bucket.acquire()
 			try:
 				result = func(*args, **kwargs)
 				self.__last_request_time = time.time()
 				return result
-			except Exception as e:
-				if "Error (HTTP 503)" in str(e):
-					delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-					logging.warning(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
-					time.sleep(delay)
+			except RoamHTTPError as e:
+				if e.status in (429, 503):
+					logging.warning("Rate limit hit (attempt %s). Backing off...", attempt + 1)
+					self._bucket.penalty(e.retry_after or 5)
+					if e.retry_after:
+						time.sleep(e.retry_after)
+					else:
+						_sleep_backoff(attempt)
 				else:
 					logging.error(f"Error in API call: {str(e)}")
 					return None
+			except Exception as e:
+				logging.error(f"Error in API call: {str(e)}")
+				return None
 		logging.error("Max retries reached. Failed to make API call.")
 		return None
 
 	def get_graph_structure(self):
-		"""Get a high-level structure of the graph (pages and their immediate children)."""
-		query = '[:find (pull ?e [:node/title {:block/children [:block/string]}]) :where [?e :node/title]]'
-		return q(self.client, query)
+		"""Get a high-level structure of the graph (pages and their immediate children).
+
+		The response covers every page, so repeated calls in rapid
+		succession (agents, UIs) are served from a short TTL cache rather
+		than re-transmitting the whole graph; any write through this
+		client invalidates it. iter_graph_structure remains the
+		memory-friendly alternative."""
+		cached = self._read_cache.get(('graph_structure',))
+		if cached is not None:
+			return cached
+		result = q(self.client, _Q_GRAPH_STRUCTURE)
+		if result:
+			self._read_cache.set(('graph_structure',), result, ttl=30)
+		return result
 
 	def get_page(self, query, prefix, output_format='json'):
-		logging.info(f"Line 370: Prefix is equal to {prefix}")
+		logging.info("Line 370: Prefix is equal to %s", prefix)
 
 		today = datetime.datetime.now()
 		if query == "today":
@@ -443,7 +1094,7 @@ class RoamAPI:
 		elif query == "lastweek":
 			lastweek = today - datetime.timedelta(days=7)
 			query = self.get_roam_date_format(lastweek)
-		elif re.match(r'^\d{4}-\d{2}-\d{2}$', query):
+		elif _is_iso_date(query):
 			# It's a date in YYYY-MM-DD format
 			date_obj = datetime.datetime.strptime(query, "%Y-%m-%d")
 			query = self.get_roam_date_format(date_obj)
@@ -461,74 +1112,154 @@ class RoamAPI:
 			return f"No content found for page: {query}"
 
 		if output_format == 'json':
-			return json.dumps(page_content, indent=2)
+			return _dumps(page_content, pretty=True)
 		elif output_format == 'markdown':
 			if prefix is not None and prefix != "":
 				prefix = f"{prefix} " # adds a space after
 			elif prefix is None:
 				prefix = ""
-			logging.info(f"Line 406: Prefix is equal to {prefix}")
+			logging.info("Line 406: Prefix is equal to %s", prefix)
 			return convert_to_markdown(page_content, prefix)
 		else:
 			raise ValueError("Invalid output format. Use 'json' or 'markdown'.")
 
-	def import_markdown_file(self, file_path):
+	@staticmethod
+	def _read_frontmatter(file):
+		"""Read YAML frontmatter from an open file without slurping the body.
+
+		Returns (metadata, replay_lines): replay_lines holds any lines that
+		were consumed but turned out to belong to the body, so callers can
+		chain them back in front of the remaining file iterator."""
+		first = file.readline()
+		if first.strip() != '---':
+			return {}, [first] if first else []
+		fm_lines = []
+		while True:
+			line = file.readline()
+			if not line:
+				# Unterminated frontmatter: treat everything read as body
+				logging.warning("No valid YAML frontmatter found. Treating entire content as markdown.")
+				return {}, [first] + fm_lines
+			if line.strip() == '---':
+				break
+			fm_lines.append(line)
 		try:
-			with open(file_path, 'r', encoding='utf-8') as file:
-				content = file.read()
+			return yaml.load(''.join(fm_lines), Loader=_YamlLoader) or {}, []
+		except yaml.YAMLError as e:
+			logging.error(f"Error parsing YAML frontmatter: {e}")
+			return {}, []
+
+	@staticmethod
+	def _title_and_tags(metadata, file_path):
+		"""Derive the page title and tag string from parsed frontmatter."""
+		title = metadata.get('title')
+		if not title:
+			logging.warning("No title found in frontmatter. Using filename as title.")
+			title = os.path.splitext(os.path.basename(file_path))[0]
+
+		tag_string = ""
+		tags = metadata.get('tags')
+		if tags:
+			if isinstance(tags, list):
+				tag_string = ' '.join([f"#{tag}" for tag in tags])
+			elif isinstance(tags, str):
+				tag_string = ' '.join([f"#{tag.strip()}" for tag in tags.split(',')])
+		return title, tag_string
+
+	def _parse_markdown_file(self, file_path):
+		"""Read a markdown file and parse it into (title, tag_string, blocks).
+
+		Pure CPU/disk work with no API calls, so it can run on a worker
+		thread while other files are being uploaded."""
+		with open(file_path, 'r', encoding='utf-8') as file:
+			metadata, replay = self._read_frontmatter(file)
+			# Stream the body line-by-line off disk; only the parsed block
+			# tree is held in memory, never the raw file contents
+			blocks = list(self.parse_markdown_stream(itertools.chain(replay, file)))
+
+		title, tag_string = self._title_and_tags(metadata, file_path)
+		return title, tag_string, blocks
+
+	def _upload_parsed_markdown(self, title, tag_string, blocks):
+		"""Upload the output of _parse_markdown_file to the graph."""
+		page_uid = self.get_or_create_page_uid(title)
+		if not page_uid:
+			return False, f"Failed to create page: {title}"
 
-			# Split content into frontmatter and markdown
-			parts = content.split('---', 2)
+		if tag_string:
+			self.create_block_with_children(page_uid, {'content': tag_string})
 
-			# Check if we have valid frontmatter
-			if len(parts) < 3:
-				logging.warning("No valid YAML frontmatter found. Treating entire content as markdown.")
-				metadata = {}
-				markdown_content = content
-			else:
-				# Parse YAML frontmatter
-				try:
-					metadata = yaml.safe_load(parts[1])
-					markdown_content = parts[2].strip()
-				except yaml.YAMLError as e:
-					logging.error(f"Error parsing YAML frontmatter: {e}")
-					metadata = {}
-					markdown_content = content
-
-			# Get or create title
-			title = metadata.get('title')
-			if not title:
-				logging.warning("No title found in frontmatter. Using filename as title.")
-				title = os.path.splitext(os.path.basename(file_path))[0]
-
-			page_uid = self.get_or_create_page_uid(title)
-			if not page_uid:
-				return False, f"Failed to create page: {title}"
-
-			# Handle tags if present in the metadata
-			tags = metadata.get('tags')
-			if tags:
-				if isinstance(tags, list):
-					tag_string = ' '.join([f"#{tag}" for tag in tags])
-				elif isinstance(tags, str):
-					tag_string = ' '.join([f"#{tag.strip()}" for tag in tags.split(',')])
-				else:
-					tag_string = ""
+		if not self.batch_create_blocks(page_uid, blocks):
+			return False, f"Failed to import all blocks to page: {title}"
+		return True, f"Successfully imported to page: {title}"
 
+	def import_markdown_file(self, file_path):
+		"""Import one markdown file with a fully streaming pipeline.
+
+		The open file feeds parse_markdown_stream, whose blocks feed
+		batch_create_blocks as they close — peak memory is one top-level
+		subtree plus one batch, and the first HTTP write goes out before
+		the file has been fully read."""
+		try:
+			with open(file_path, 'r', encoding='utf-8') as file:
+				metadata, replay = self._read_frontmatter(file)
+				title, tag_string = self._title_and_tags(metadata, file_path)
+
+				page_uid = self.get_or_create_page_uid(title)
+				if not page_uid:
+					return False, f"Failed to create page: {title}"
 				if tag_string:
 					self.create_block_with_children(page_uid, {'content': tag_string})
 
-			blocks = self.parse_markdown(markdown_content)
-			self.batch_create_blocks(page_uid, blocks)
-
+				ok = self.batch_create_blocks(
+					page_uid, self.parse_markdown_stream(itertools.chain(replay, file)))
+			if not ok:
+				return False, f"Failed to import all blocks to page: {title}"
 			return True, f"Successfully imported to page: {title}"
 		except Exception as e:
 			logging.error(f"Error importing file: {str(e)}", exc_info=True)
 			return False, f"Error importing file: {str(e)}"
 
+	async def import_markdown_files(self, file_paths, max_concurrent=8):
+		"""Import several markdown files with parsing and uploading overlapped.
+
+		A producer parses files on worker threads and feeds a bounded
+		queue; consumers pull parsed trees and upload them, so total
+		wall-clock approaches max(total parse time, total upload time)
+		instead of their sum."""
+		queue = asyncio.Queue(maxsize=16)
+		results = {}
+
+		async def producer():
+			for path in file_paths:
+				try:
+					parsed = await asyncio.to_thread(self._parse_markdown_file, path)
+					await queue.put((path, parsed))
+				except Exception as e:
+					logging.error(f"Error parsing file {path}: {str(e)}")
+					results[path] = (False, f"Error importing file: {str(e)}")
+			for _ in range(max_concurrent):
+				await queue.put(None)
+
+		async def consumer():
+			while True:
+				item = await queue.get()
+				if item is None:
+					return
+				path, parsed = item
+				try:
+					results[path] = await asyncio.to_thread(self._upload_parsed_markdown, *parsed)
+				except Exception as e:
+					logging.error(f"Error importing file {path}: {str(e)}")
+					results[path] = (False, f"Error importing file: {str(e)}")
+
+		await asyncio.gather(producer(), *[consumer() for _ in range(max_concurrent)])
+		return [results[p] for p in file_paths]
+
 # Example usage
 if __name__ == "__main__":
 	import os
+	import sys
 	from dotenv import load_dotenv
 
 	load_dotenv()
@@ -543,13 +1274,13 @@ if __name__ == "__main__":
 	roam.add_block_with_retry(page_title, "This is a test block")
 	roam.add_block_with_retry(page_title, "This is another test block")
 
-	# Get and print page content
+	# Get and print page content with a single pull query instead of one
+	# round-trip per block UID, then emit everything in one buffered write
 	page_uid = roam.get_page_uid(page_title)
-	block_uids = roam.get_block_uids(page_title)
-	print(f"Page UID: {page_uid}")
-	print("Blocks:")
-	for uid in block_uids:
-		content = roam.get_block_content(uid)
-		print(f"- {content}")
+	page_content = roam.get_page_content(page_uid)
+	lines = [f"Page UID: {page_uid}", "Blocks:"]
+	lines.extend(f"- {child.get(':block/string', '')}"
+		for child in (page_content or {}).get(':block/children', []))
+	sys.stdout.write('\n'.join(lines) + '\n')
 
 	print("Test completed.")
\ No newline at end of file